@@ -20,10 +20,16 @@ la interfaz (frontend) como:
 Autor: ChatGPT
 """
 from __future__ import annotations
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional, Set, Tuple
+from functools import lru_cache
+from typing import Iterable, List, Dict, Optional, Set, Tuple
 from datetime import date, timedelta
+from itertools import combinations, cycle
 import random
+import sys
 
 # ------------------------------- Datos base (listas para formularios) -------------------------------
 PROVINCIAS_CR = [
@@ -34,11 +40,41 @@ ESTADOS_CIVILES = [
 ]
 GENEROS = ["Masculino", "Femenino", "Otro"]
 
+# Grupos de estado civil para los predicados calientes: pertenencia O(1)
+# en frozenset en vez de barrer una tupla de literales en cada chequeo
+EN_PAREJA = frozenset({"Casado(a)", "Unión libre"})
+SIN_PAREJA = frozenset({"Soltero(a)", "Divorciado(a)", "Viudo(a)"})
+
 # Afinidades (mínimo 2 por persona)
 AFINIDADES = [
     "Deporte", "Arte", "Ciencia", "Música", "Lectura", "Viajes", "Gastronomía", "Videojuegos"
 ]
 
+# Datos para nacimientos simulados (constantes de módulo: evita reconstruir
+# las listas literales en cada nacimiento del tick)
+NOMBRES_BEBE = ("Alex", "Sam", "Pat", "Luz", "Mar", "Ari", "Noa", "Kai")
+_GENEROS_NACIMIENTO = ("Masculino", "Femenino")  # binario por simplicidad
+
+# Pares de afinidades por defecto, asignados en ciclo determinista: evita
+# el random.sample por inserción (copias y chequeos de límites en cada
+# alta) y hace reproducible la siembra masiva de personas
+_default_afin_cycle = cycle(combinations(AFINIDADES, 2))
+
+# Tope de generaciones para los recorridos de linaje: los guards de
+# visitados ya cortan los ciclos, pero el límite acota además cadenas
+# absurdamente largas por datos corruptos (gramps usa un tope similar)
+MAX_GENERACIONES = 30
+
+# Constantes de la fórmula de mortalidad (evitar divisiones en el bucle del tick)
+INV_1200 = 1.0 / 1200.0
+INV_10000 = 1.0 / 10000.0
+
+# Banda de días alrededor de los 50 años: por debajo del mínimo la edad es
+# seguro < 50, por encima del máximo es seguro >= 50; sólo el intervalo
+# intermedio necesita aritmética exacta de calendario
+_DIAS_50_MIN = 50 * 365
+_DIAS_50_MAX = 50 * 366
+
 # ------------------------------- Utilidades de fecha -------------------------------
 
 def hoy() -> date:
@@ -50,13 +86,25 @@ def anios_entre(fecha: date, ref: Optional[date] = None) -> int:
         return 0
     ref = ref or hoy()
     y = ref.year - fecha.year
-    if (ref.month, ref.day) < (fecha.month, fecha.day):
+    # Comparación lexicográfica escrita a mano: evita construir dos tuplas
+    # por llamada en el único punto donde falla la caché de edades
+    if ref.month < fecha.month or (ref.month == fecha.month and ref.day < fecha.day):
         y -= 1
     return max(0, y)
 
+@lru_cache(maxsize=4096)
+def _edad_en(fnac: date, ref: date) -> int:
+    """Edad memoizada: función pura de (nacimiento, referencia).
+
+    La UI pide la edad de cada persona en cada refresco mientras la fecha
+    simulada sólo avanza en el tick de eventos; el LRU acotado desaloja
+    solo las fechas viejas sin necesidad de limpieza explícita.
+    """
+    return anios_entre(fnac, ref)
+
 # ------------------------------- Modelo de dominio -------------------------------
 
-@dataclass
+@dataclass(slots=True, eq=False)
 class Persona:
     cedula: str
     nombre: str
@@ -74,16 +122,55 @@ class Persona:
     # Afinidades (al menos 2 etiquetas)
     afinidades: Set[str] = field(default_factory=set)
 
-    # Historial (tuplas: (año, evento))
-    historial: List[Tuple[int, str]] = field(default_factory=list)
+    # Historial como columnas paralelas (SoA) ordenadas por año al insertar:
+    # los años viven en un buffer contiguo y los extremos dan el rango O(1)
+    _hist_anios: array = field(default_factory=lambda: array("i"), init=False, repr=False)
+    _hist_eventos: List[str] = field(default_factory=list, init=False, repr=False)
+    # Columna de años ya formateados: el timeline dibuja strings y así no
+    # repite la conversión int->str en cada redibujo
+    _hist_anios_str: List[str] = field(default_factory=list, init=False, repr=False)
 
     # Salud emocional (0-100), afecta esperanza de vida de forma simple
     salud_emocional: int = 75
 
+    # (mes, día) de nacimiento precalculado: la tabla de edades del tick
+    # compara esta tupla contra la de la fecha simulada sin re-leer los
+    # atributos del date en cada persona
+    _birth_md: Tuple[int, int] = field(init=False, repr=False)
+
+    # Memo: edad al fallecer (inmutable una vez registrada la defunción)
+    _edad_fallecer: Optional[int] = field(default=None, init=False, repr=False)
+
+    # Memo: historial ordenado por año (invalidado al registrar eventos)
+    _historial_orden: Optional[List[Tuple[int, str]]] = field(default=None, init=False, repr=False)
+
+    # Memo: historial ya compuesto como texto (una línea por evento)
+    _historial_texto: Optional[str] = field(default=None, init=False, repr=False)
+
+    def __post_init__(self):
+        self._birth_md = (self.fecha_nacimiento.month, self.fecha_nacimiento.day)
+
+    # Identidad por cédula: el __eq__ generado compararía todos los campos
+    # (sets de relaciones e historial incluidos) en cada uso incidental de
+    # `in`/dict; la cédula es la clave del dominio y basta
+    def __eq__(self, otra: object) -> bool:
+        return isinstance(otra, Persona) and self.cedula == otra.cedula
+
+    def __hash__(self) -> int:
+        return hash(self.cedula)
+
+    def edad_al_fallecer(self) -> Optional[int]:
+        """Edad alcanzada al fallecer; None si la persona sigue viva."""
+        if self.fecha_fallecimiento is None:
+            return None
+        if self._edad_fallecer is None:
+            self._edad_fallecer = anios_entre(self.fecha_nacimiento, self.fecha_fallecimiento)
+        return self._edad_fallecer
+
     def edad(self, ref: Optional[date] = None) -> int:
         if self.fecha_fallecimiento:
-            return anios_entre(self.fecha_nacimiento, self.fecha_fallecimiento)
-        return anios_entre(self.fecha_nacimiento, ref)
+            return self.edad_al_fallecer()
+        return _edad_en(self.fecha_nacimiento, ref or hoy())
 
     @property
     def vivo(self) -> bool:
@@ -91,7 +178,40 @@ class Persona:
 
     def registrar_evento(self, descripcion: str, fecha_ref: Optional[date] = None):
         f = fecha_ref or hoy()
-        self.historial.append((f.year, descripcion))
+        anio = f.year
+        # bisect_right: los eventos del mismo año conservan orden de llegada
+        i = bisect_right(self._hist_anios, anio)
+        self._hist_anios.insert(i, anio)
+        self._hist_eventos.insert(i, descripcion)
+        self._hist_anios_str.insert(i, str(anio))
+        self._historial_orden = None
+        self._historial_texto = None
+
+    @property
+    def historial(self) -> List[Tuple[int, str]]:
+        """Vista (año, evento) del historial, ya ordenada por año."""
+        return self.historial_ordenado()
+
+    def historial_ordenado(self) -> List[Tuple[int, str]]:
+        """Historial ordenado por año, memoizado entre redibujos de la UI."""
+        if self._historial_orden is None:
+            self._historial_orden = list(zip(self._hist_anios, self._hist_eventos))
+        return self._historial_orden
+
+    def historial_anios_str(self) -> List[str]:
+        """Años del historial ya convertidos a string (columna paralela)."""
+        return self._hist_anios_str
+
+    def historial_texto(self) -> str:
+        """Historial como un solo bloque de texto, memoizado.
+
+        Mientras no se registren eventos, los redibujos de la UI reutilizan
+        el mismo string sin asignar nada.
+        """
+        if self._historial_texto is None:
+            self._historial_texto = "".join(
+                f"{a}: {e}\n" for a, e in zip(self._hist_anios, self._hist_eventos))
+        return self._historial_texto
 
     def marcar_fallecido(self, fecha_def: Optional[date] = None):
         if self.fecha_fallecimiento is None:
@@ -99,21 +219,28 @@ class Persona:
             self.estado_civil = "Viudo(a)" if self.parejas else self.estado_civil
             self.registrar_evento("Fallecimiento")
 
-    def es_compatible_para_union(self, otra: "Persona") -> bool:
+    def indice_compatibilidad(self, otra: "Persona",
+                              edad_propia: Optional[int] = None,
+                              edad_otra: Optional[int] = None) -> int:
+        """Índice de compatibilidad 0..100, o -1 si las reglas base lo impiden."""
         if not self.vivo or not otra.vivo:
-            return False
-        # Reglas base
-        if self.estado_civil in ("Casado(a)", "Unión libre"):
-            return False
-        if otra.estado_civil in ("Casado(a)", "Unión libre"):
-            return False
-        if self.edad() < 18 or otra.edad() < 18:
-            return False
-        if abs(self.edad() - otra.edad()) > 15:
-            return False
+            return -1
+        # Reglas base: predicados O(1) primero; el álgebra de conjuntos de
+        # afinidades sólo se calcula si todos los rechazos baratos pasan
+        if self.estado_civil in EN_PAREJA or otra.estado_civil in EN_PAREJA:
+            return -1
+        # Edades: aceptar valores precalculados (p. ej. por tick de simulación)
+        ea = edad_propia if edad_propia is not None else self.edad()
+        eb = edad_otra if edad_otra is not None else otra.edad()
+        if ea < 18 or eb < 18:
+            return -1
+        if abs(ea - eb) > 15:
+            return -1
         # Índice de compatibilidad simple: afinidades compartidas y balance genético naive
-        afin_comun = len(self.afinidades.intersection(otra.afinidades))
-        afin_total = len(self.afinidades.union(otra.afinidades)) or 1
+        afin_a, afin_b = self.afinidades, otra.afinidades
+        afin_comun = len(afin_a.intersection(afin_b))
+        # Tamaño de la unión por inclusión-exclusión: no materializa el set
+        afin_total = (len(afin_a) + len(afin_b) - afin_comun) or 1
         score_afinidad = int(100 * (afin_comun / afin_total))  # 0..100
         score_emocional = (self.salud_emocional + otra.salud_emocional) // 2
         # "Compatibilidad genética" naive: penalizar si comparten ambos padres (evitar consanguinidad directa)
@@ -121,24 +248,111 @@ class Persona:
         if self.padres and self.padres == otra.padres:
             comp_genetica = 20  # muy bajo si comparten ambos padres
         # Índice total ponderado
-        indice = int(0.6 * score_afinidad + 0.2 * score_emocional + 0.2 * comp_genetica)
-        return indice >= 70
+        return int(0.6 * score_afinidad + 0.2 * score_emocional + 0.2 * comp_genetica)
 
+    def es_compatible_para_union(self, otra: "Persona",
+                                 edad_propia: Optional[int] = None,
+                                 edad_otra: Optional[int] = None) -> bool:
+        return self.indice_compatibilidad(otra, edad_propia, edad_otra) >= 70
 
-@dataclass
+
+@dataclass(slots=True)
 class Familia:
     id_familia: str
     nombre: str
     miembros: Dict[str, Persona] = field(default_factory=dict)  # cedula -> Persona
 
+    # Índice ordenado por fecha de nacimiento (ordinal, cédula): las
+    # consultas por rango de fechas se resuelven con bisect en O(log N + k)
+    _por_nacimiento: List[Tuple[int, str]] = field(default_factory=list)
+
+    # Índice ordenado por nombre (nombre, cédula): la UI lista miembros
+    # alfabéticamente en cada refresco y así no reordena nunca
+    _por_nombre: List[Tuple[str, str]] = field(default_factory=list)
+
+    # Contador monótono de mutaciones: sirve de clave de invalidación para
+    # caches de recorridos (ver ArbolGenealogico)
+    revision: int = 0
+
+    # Contador aparte para mutaciones de parentesco (padres/hijos): los
+    # recorridos que sólo dependen del linaje sobreviven a ticks que
+    # únicamente registran muertes, uniones o eventos
+    revision_linaje: int = 0
+
+    # Cédulas de los miembros vivos: los bucles calientes del tick iteran
+    # este conjunto en vez de filtrar a toda la familia (los fallecidos se
+    # acumulan con el tiempo y dominarían el barrido)
+    vivos: Set[str] = field(default_factory=set)
+
+    # Parejas vigentes como tuplas canónicas (cédula menor, mayor): los
+    # nacimientos y las consultas por pareja iteran U uniones en vez de
+    # recorrer a cada persona y sus conjuntos de parejas
+    uniones: Set[Tuple[str, str]] = field(default_factory=set)
+
+    # Hijos en común por pareja (misma clave canónica que `uniones`): se
+    # mantiene al nacer o vincular hijos, y la consulta de parejas con 2+
+    # hijos se vuelve un filtrado del dict sin set-ops. A diferencia de
+    # `uniones`, la viudez NO borra la entrada: la pareja disuelta sigue
+    # contando para la consulta, como en la semántica original
+    hijos_comunes: Dict[Tuple[str, str], int] = field(default_factory=dict)
+
+    # Resultado precalculado de la consulta "fallecidos antes de 50":
+    # cédulas mantenidas incrementalmente al registrar cada fallecimiento,
+    # de modo que la consulta sea O(|resultado|) y no recorra la familia
+    _fallecidos_antes_50: Set[str] = field(default_factory=set)
+
     def agregar_persona(self, p: Persona):
         self.miembros[p.cedula] = p
+        insort(self._por_nacimiento, (p.fecha_nacimiento.toordinal(), p.cedula))
+        insort(self._por_nombre, (p.nombre, p.cedula))
+        if p.vivo:
+            self.vivos.add(p.cedula)
+        self._indexar_fallecimiento(p)
+        self.revision += 1
+
+    def registrar_fallecimiento(self, p: Persona, fecha: Optional[date] = None):
+        """Marca el fallecimiento y mantiene el índice de muertes tempranas."""
+        p.marcar_fallecido(fecha)
+        self.vivos.discard(p.cedula)
+        self._indexar_fallecimiento(p)
+        self.revision += 1
+
+    def _indexar_fallecimiento(self, p: Persona):
+        f = p.fecha_fallecimiento
+        if f is None:
+            return
+        # Mismo prefiltro en días que usaba la consulta: sólo la banda
+        # ambigua paga el cálculo exacto de edad
+        dias = f.toordinal() - p.fecha_nacimiento.toordinal()
+        if dias < _DIAS_50_MIN or (dias <= _DIAS_50_MAX and p.edad_al_fallecer() < 50):
+            self._fallecidos_antes_50.add(p.cedula)
 
     def obtener(self, cedula: str) -> Optional[Persona]:
         return self.miembros.get(cedula)
 
-    def todas_personas(self) -> List[Persona]:
-        return list(self.miembros.values())
+    def todas_personas(self) -> Iterable[Persona]:
+        # Vista viva del dict: los llamadores sólo iteran, así que no hay
+        # motivo para copiar a una lista en cada llamada (quien necesite
+        # una instantánea o mutar durante el recorrido envuelve en list())
+        return self.miembros.values()
+
+    def hermanos_de(self, p: Persona) -> Set[str]:
+        """Cédulas de los hermanos de `p`: unión de los hijos de sus padres.
+
+        Usa el índice Persona.hijos, así que cuesta unas pocas uniones de
+        conjuntos en vez de un barrido por toda la familia.
+        """
+        get = self.miembros.get
+        hermanos = {c for ced_padre in p.padres
+                    for padre in (get(ced_padre),) if padre
+                    for c in padre.hijos}
+        hermanos.discard(p.cedula)
+        return hermanos
+
+    def miembros_por_nombre(self) -> List[Persona]:
+        """Miembros en orden alfabético, leídos del índice mantenido."""
+        get = self.miembros.get
+        return [get(ced) for _, ced in self._por_nombre]
 
 
 class ArbolGenealogico:
@@ -147,6 +361,19 @@ class ArbolGenealogico:
         self.familias: Dict[str, Familia] = {}
         # Reloj simulado
         self.fecha_simulada: date = hoy()
+        # Generador propio y reutilizable: evita la indirección del módulo
+        # random en los bucles del tick y permite sembrar la simulación
+        self.rng: random.Random = random.Random()
+        # Cache de índices de compatibilidad por par (se limpia al avanzar el
+        # reloj o al mutar estados que afectan el índice)
+        self._scores_union: Dict[Tuple[str, str], int] = {}
+        # Memo de la última familia resuelta: las sesiones trabajan sobre
+        # una sola familia por largos ratos y cada operación pasa por aquí
+        self._ultima_fam_id: Optional[str] = None
+        self._ultima_fam: Optional[Familia] = None
+        # Cache de recorridos (antepasados/descendientes) keyed por
+        # (consulta, familia, cédula, revisión de la familia)
+        self._cache_recorridos: Dict[Tuple[str, str, str, int], List[Persona]] = {}
 
     # ---- Gestión familias ----
     def crear_familia(self, id_familia: str, nombre: str):
@@ -155,7 +382,13 @@ class ArbolGenealogico:
         self.familias[id_familia] = Familia(id_familia, nombre)
 
     def get_familia(self, id_familia: str) -> Optional[Familia]:
-        return self.familias.get(id_familia)
+        if id_familia == self._ultima_fam_id:
+            return self._ultima_fam
+        fam = self.familias.get(id_familia)
+        if fam is not None:
+            self._ultima_fam_id = id_familia
+            self._ultima_fam = fam
+        return fam
 
     # ---- Gestión personas ----
     def agregar_persona(self, id_familia: str, persona: Persona):
@@ -164,13 +397,71 @@ class ArbolGenealogico:
             raise ValueError("Familia no existe")
         if persona.cedula in fam.miembros:
             raise ValueError("Cédula ya existe en la familia")
+        # Internar la cédula: todas las relaciones (padres/hijos/parejas)
+        # comparten la misma instancia de string, de modo que los tests de
+        # pertenencia e intersecciones de sets comparan por identidad (y el
+        # hash del string se calcula una sola vez y queda cacheado en el
+        # objeto), sin necesidad de ids enteros paralelos
+        persona.cedula = sys.intern(persona.cedula)
         # Afinidades: garantizar al menos 2 si vienen vacías
         if len(persona.afinidades) < 2:
-            persona.afinidades.update(random.sample(AFINIDADES, 2))
+            persona.afinidades.update(next(_default_afin_cycle))
         fam.agregar_persona(persona)
         persona.registrar_evento("Nacimiento", persona.fecha_nacimiento)
 
+    def agregar_personas_bulk(self, id_familia: str, personas) -> None:
+        """Inserta varias personas en una pasada (una sola revisión al final).
+
+        Mismas validaciones que agregar_persona, pero los índices ordenados
+        se reconstruyen con un sort al cierre en vez de un insort por
+        inserción, y la revisión de la familia se bumpea una única vez.
+        """
+        fam = self.get_familia(id_familia)
+        if not fam:
+            raise ValueError("Familia no existe")
+        for persona in personas:
+            if persona.cedula in fam.miembros:
+                raise ValueError("Cédula ya existe en la familia")
+            persona.cedula = sys.intern(persona.cedula)
+            if len(persona.afinidades) < 2:
+                persona.afinidades.update(next(_default_afin_cycle))
+            fam.miembros[persona.cedula] = persona
+            fam._por_nacimiento.append((persona.fecha_nacimiento.toordinal(), persona.cedula))
+            fam._por_nombre.append((persona.nombre, persona.cedula))
+            if persona.vivo:
+                fam.vivos.add(persona.cedula)
+            fam._indexar_fallecimiento(persona)
+            persona.registrar_evento("Nacimiento", persona.fecha_nacimiento)
+        fam._por_nacimiento.sort()
+        fam._por_nombre.sort()
+        fam.revision += 1
+
+    def registrar_padres_hijos_bulk(self, id_familia: str, pares) -> None:
+        """Registra varios vínculos (cédula padre, cédula hijo) de una vez."""
+        fam = self.get_familia(id_familia)
+        if not fam:
+            raise ValueError("Familia no existe")
+        for ced_padre, ced_hijo in pares:
+            padre, hijo = fam.obtener(ced_padre), fam.obtener(ced_hijo)
+            if not padre or not hijo:
+                continue
+            hijo.padres.add(padre.cedula)
+            padre.hijos.add(hijo.cedula)
+        fam.revision += 1
+        fam.revision_linaje += 1
+
     # ---- Relaciones ----
+    def _indice_union(self, a: Persona, b: Persona,
+                      edad_a: Optional[int] = None,
+                      edad_b: Optional[int] = None) -> int:
+        """Índice de compatibilidad memoizado por par canónico (a, b)."""
+        key = (a.cedula, b.cedula) if a.cedula < b.cedula else (b.cedula, a.cedula)
+        indice = self._scores_union.get(key)
+        if indice is None:
+            indice = a.indice_compatibilidad(b, edad_a, edad_b)
+            self._scores_union[key] = indice
+        return indice
+
     def unir_pareja(self, id_familia: str, ced1: str, ced2: str):
         fam = self.get_familia(id_familia)
         if not fam:
@@ -178,12 +469,19 @@ class ArbolGenealogico:
         a, b = fam.obtener(ced1), fam.obtener(ced2)
         if not a or not b:
             return False
-        if not a.es_compatible_para_union(b):
+        if self._indice_union(a, b) < 70:
             return False
         a.parejas.add(b.cedula)
         b.parejas.add(a.cedula)
+        clave = (a.cedula, b.cedula) if a.cedula < b.cedula else (b.cedula, a.cedula)
+        fam.uniones.add(clave)
+        # Hijos previos a la unión cuentan desde el arranque del contador
+        fam.hijos_comunes[clave] = len(a.hijos & b.hijos)
         a.estado_civil = "Unión libre"
         b.estado_civil = "Unión libre"
+        fam.revision += 1
+        # El cambio de estado civil invalida los índices cacheados
+        self._scores_union.clear()
         a.registrar_evento(f"Unión de pareja con {b.nombre}")
         b.registrar_evento(f"Unión de pareja con {a.nombre}")
         return True
@@ -203,6 +501,7 @@ class ArbolGenealogico:
         b.estado_civil = "Casado(a)"
         a.registrar_evento(f"Matrimonio con {b.nombre}")
         b.registrar_evento(f"Matrimonio con {a.nombre}")
+        fam.revision += 1
         return True
 
     def registrar_padre_hijo(self, id_familia: str, ced_padre: str, ced_hijo: str):
@@ -212,8 +511,19 @@ class ArbolGenealogico:
         padre, hijo = fam.obtener(ced_padre), fam.obtener(ced_hijo)
         if not padre or not hijo:
             return False
+        if hijo.cedula in padre.hijos:
+            return True  # vínculo ya registrado: no duplicar contadores
         hijo.padres.add(padre.cedula)
         padre.hijos.add(hijo.cedula)
+        # Si el otro progenitor es pareja del nuevo padre, el hijo suma al
+        # contador de hijos en común de esa unión
+        for ced_otro in hijo.padres:
+            if ced_otro != padre.cedula and ced_otro in padre.parejas:
+                clave = ((ced_otro, padre.cedula) if ced_otro < padre.cedula
+                         else (padre.cedula, ced_otro))
+                fam.hijos_comunes[clave] = fam.hijos_comunes.get(clave, 0) + 1
+        fam.revision += 1
+        fam.revision_linaje += 1
         return True
 
     def registrar_nacimiento_de_pareja(self, id_familia: str, ced1: str, ced2: str) -> Optional[Persona]:
@@ -226,10 +536,11 @@ class ArbolGenealogico:
         if b.cedula not in a.parejas:
             return None
         # Nuevo hijo
-        new_ced = str(random.randint(10_000_000, 99_999_999))
-        nombre = random.choice(["Alex", "Sam", "Pat", "Luz", "Mar", "Ari", "Noa", "Kai"])
-        genero = random.choice(["Masculino", "Femenino"])  # binario por simplicidad
-        provincia = random.choice([a.provincia, b.provincia])
+        rng = self.rng
+        new_ced = str(rng.randint(10_000_000, 99_999_999))
+        nombre = rng.choice(NOMBRES_BEBE)
+        genero = rng.choice(_GENEROS_NACIMIENTO)
+        provincia = a.provincia if rng.random() < 0.5 else b.provincia
         p = Persona(
             cedula=new_ced,
             nombre=nombre,
@@ -243,13 +554,42 @@ class ArbolGenealogico:
         p.padres.update({a.cedula, b.cedula})
         a.hijos.add(p.cedula)
         b.hijos.add(p.cedula)
+        clave = (a.cedula, b.cedula) if a.cedula < b.cedula else (b.cedula, a.cedula)
+        fam.hijos_comunes[clave] = fam.hijos_comunes.get(clave, 0) + 1
+        fam.revision_linaje += 1
         a.registrar_evento(f"Nacimiento de hijo/a {p.nombre}")
         b.registrar_evento(f"Nacimiento de hijo/a {p.nombre}")
         return p
 
     # ---- Efectos colaterales ----
+    def _edades(self, fam: Familia, ref: Optional[date] = None) -> Dict[str, int]:
+        """Precalcula la edad de cada miembro vivo a la fecha `ref` (por defecto la simulada).
+
+        Evita recomputar aritmética de fechas dentro de los bucles del tick,
+        donde la fecha de referencia no cambia. Sólo cubre a los vivos: los
+        bucles que puedan encontrarse a alguien fuera de la tabla (p. ej.
+        nacidos durante el mismo tick) usan Persona.edad como respaldo.
+        """
+        ref = ref or self.fecha_simulada
+        miembros = fam.miembros
+        # Aritmética directa año/mes-día con la tupla precalculada de cada
+        # persona: sin pasar por la caché LRU ni hashear fechas por entrada
+        ref_y = ref.year
+        ref_md = (ref.month, ref.day)
+        edades: Dict[str, int] = {}
+        for c in fam.vivos:
+            p = miembros[c]
+            y = ref_y - p.fecha_nacimiento.year - (ref_md < p._birth_md)
+            edades[c] = y if y > 0 else 0
+        return edades
+
     def gestionar_viudez(self, fam: Familia, persona_fallecida: Persona):
+        ced_f = persona_fallecida.cedula
         for ced in list(persona_fallecida.parejas):
+            clave = (ced_f, ced) if ced_f < ced else (ced, ced_f)
+            # sólo la unión activa se disuelve (nacimientos); el conteo de
+            # hijos en común se conserva para la consulta de parejas
+            fam.uniones.discard(clave)
             pareja = fam.obtener(ced)
             if pareja and pareja.vivo:
                 pareja.estado_civil = "Viudo(a)"
@@ -257,39 +597,50 @@ class ArbolGenealogico:
                 pareja.registrar_evento("Quedó viudo(a)")
                 # Probabilidad menor de volver a unirse: bajar algo salud emocional
                 pareja.salud_emocional = max(0, pareja.salud_emocional - 10)
+        # Viudez cambia estado civil y salud: invalidar índices cacheados
+        self._scores_union.clear()
 
-    def reasignar_tutoria_menores(self, fam: Familia):
+    def reasignar_tutoria_menores(self, fam: Familia, edades: Optional[Dict[str, int]] = None):
         # Si mueren madre y padre de un menor (<18), asignar tutor: tía/o, abuela/o si existe
-        for p in fam.todas_personas():
-            if not p.vivo:
-                continue
-            if p.edad(self.fecha_simulada) < 18:
+        if edades is None:
+            edades = self._edades(fam)
+
+        def edad_de(q: Persona) -> int:
+            # Los nacidos durante el tick pueden no estar en el precalculado
+            e = edades.get(q.cedula)
+            return e if e is not None else q.edad(self.fecha_simulada)
+
+        get = fam.miembros.get  # ligar el lookup una vez para los bucles
+        # Sólo los vivos pueden necesitar tutor; el índice evita tocar a
+        # los fallecidos acumulados
+        for p in [get(c) for c in fam.vivos]:
+            if edad_de(p) < 18:
                 # Verificar estado de sus padres
-                padres = [fam.obtener(c) for c in p.padres]
+                padres = [get(c) for c in p.padres]
                 if padres and all((pp and not pp.vivo) for pp in padres):
                     # buscar tutor (tío/tía = hermanos de los padres) o abuelos (padres de los padres)
                     candidatos: List[Persona] = []
                     for pp in padres:
                         if not pp:
                             continue
-                        # hermanos de pp = personas que comparten al menos un padre con pp
-                        for q in fam.todas_personas():
-                            if q.cedula == pp.cedula or not q.vivo:
-                                continue
-                            if q.padres and q.padres.intersection(pp.padres):
-                                candidatos.append(q)
-                        # abuelos
+                        # abuelos vivos
                         for ced_ab in pp.padres:
-                            ab = fam.obtener(ced_ab)
+                            ab = get(ced_ab)
                             if ab and ab.vivo:
                                 candidatos.append(ab)
+                        # tíos/tías = hermanos de pp (lookup indexado)
+                        for ced_h in fam.hermanos_de(pp):
+                            q = get(ced_h)
+                            if q and q.vivo:
+                                candidatos.append(q)
                     if candidatos:
-                        tutor = max(candidatos, key=lambda r: r.edad(self.fecha_simulada))
+                        tutor = max(candidatos, key=edad_de)
                         p.registrar_evento(f"Tutor legal asignado: {tutor.nombre}")
 
     # ---- Búsquedas ----
     def relacion_entre(self, fam: Familia, ced_a: str, ced_b: str) -> str:
-        a, b = fam.obtener(ced_a), fam.obtener(ced_b)
+        get = fam.miembros.get  # ligar el lookup una vez para los bucles
+        a, b = get(ced_a), get(ced_b)
         if not a or not b:
             return "No encontrado"
         if b.cedula in a.parejas:
@@ -302,8 +653,8 @@ class ArbolGenealogico:
         if a.padres and b.padres and a.padres.intersection(b.padres):
             return "Hermanos(as)"
         # primo: padres son hermanos
-        padres_a = [fam.obtener(c) for c in a.padres]
-        padres_b = [fam.obtener(c) for c in b.padres]
+        padres_a = [get(c) for c in a.padres]
+        padres_b = [get(c) for c in b.padres]
         for pa in padres_a:
             for pb in padres_b:
                 if pa and pb and pa.padres and pb.padres and pa.padres.intersection(pb.padres):
@@ -311,152 +662,236 @@ class ArbolGenealogico:
         return "Relación lejana o no directa"
 
     def primos_primer_grado(self, fam: Familia, ced_x: str) -> List[Persona]:
-        x = fam.obtener(ced_x)
+        # Igual que la línea materna: depende sólo del grafo de parentesco
+        return self._recorrido_cacheado("primos", fam, ced_x,
+                                        self._primos_primer_grado_impl,
+                                        rev=fam.revision_linaje)
+
+    def _primos_primer_grado_impl(self, fam: Familia, ced_x: str) -> List[Persona]:
+        get = fam.miembros.get  # ligar el lookup una vez para los bucles
+        x = get(ced_x)
         if not x:
             return []
-        primos = []
-        # hijos de hermanos de los padres de X
+        res: List[Persona] = []
+        vistos: Set[str] = set()
+        # hijos de hermanos de los padres de X; el guard de visitados va en
+        # línea para no recorrer dos veces a los sobrinos compartidos
         for ced_padre in x.padres:
-            padre = fam.obtener(ced_padre)
+            padre = get(ced_padre)
             if not padre:
                 continue
-            # hermanos del padre = comparten al menos un progenitor
-            hermanos_padre = [q for q in fam.todas_personas() if q.cedula != padre.cedula and q.padres and padre.padres.intersection(q.padres)]
-            for tio in hermanos_padre:
+            for ced_tio in fam.hermanos_de(padre):
+                tio = get(ced_tio)
+                if not tio:
+                    continue
                 for ced_sobr in tio.hijos:
-                    sob = fam.obtener(ced_sobr)
+                    if ced_sobr in vistos:
+                        continue
+                    vistos.add(ced_sobr)
+                    sob = get(ced_sobr)
                     if sob:
-                        primos.append(sob)
-        # eliminar duplicados preservando orden
-        vistos = set()
-        res = []
-        for p in primos:
-            if p.cedula not in vistos:
-                res.append(p)
-                vistos.add(p.cedula)
+                        res.append(sob)
+        return res
+
+    def _recorrido_cacheado(self, consulta: str, fam: Familia, ced_x: str,
+                            impl, rev: Optional[int] = None) -> List[Persona]:
+        """Memoiza un recorrido por (consulta, familia, cédula, revisión).
+
+        `rev` permite usar un contador más estable que fam.revision (p. ej.
+        revision_linaje para recorridos puramente de parentesco).
+        """
+        key = (consulta, fam.id_familia, ced_x,
+               fam.revision if rev is None else rev)
+        res = self._cache_recorridos.get(key)
+        if res is None:
+            res = impl(fam, ced_x)
+            if len(self._cache_recorridos) > 1024:
+                self._cache_recorridos.clear()
+            self._cache_recorridos[key] = res
         return res
 
     def antepasados_maternos(self, fam: Familia, ced_x: str) -> List[Persona]:
-        x = fam.obtener(ced_x)
+        # La línea materna sólo cambia con el parentesco, no con cada tick
+        return self._recorrido_cacheado("antepasados", fam, ced_x,
+                                        self._antepasados_maternos_impl,
+                                        rev=fam.revision_linaje)
+
+    def _antepasados_maternos_impl(self, fam: Familia, ced_x: str) -> List[Persona]:
+        get = fam.miembros.get  # ligar el lookup una vez para el recorrido
+        x = get(ced_x)
         if not x:
             return []
         res = []
         # suponer primer elemento de padres como madre si existe, de lo contrario cualquiera
         madre: Optional[Persona] = None
         for ced in x.padres:
-            p = fam.obtener(ced)
+            p = get(ced)
             if p and p.genero == "Femenino":
                 madre = p
                 break
         if madre is None and x.padres:
-            madre = fam.obtener(next(iter(x.padres)))
+            madre = get(next(iter(x.padres)))
         cur = madre
-        while cur:
+        vistos: Set[str] = set()
+        while cur and len(res) < MAX_GENERACIONES:
+            # Guardia contra ciclos por datos mal formados (A ancestro de sí mismo)
+            if cur.cedula in vistos:
+                break
+            vistos.add(cur.cedula)
             res.append(cur)
             # madre de la madre
             next_madre = None
             for ced in cur.padres:
-                p = fam.obtener(ced)
+                p = get(ced)
                 if p and p.genero == "Femenino":
                     next_madre = p
                     break
             if next_madre is None:
                 # si no hay explícita, tomar cualquiera
                 if cur.padres:
-                    next_madre = fam.obtener(next(iter(cur.padres)))
+                    next_madre = get(next(iter(cur.padres)))
             cur = next_madre
         return res
 
     def descendientes_vivos(self, fam: Familia, ced_x: str) -> List[Persona]:
+        return self._recorrido_cacheado("descendientes", fam, ced_x, self._descendientes_vivos_impl)
+
+    def _descendientes_vivos_impl(self, fam: Familia, ced_x: str) -> List[Persona]:
         x = fam.obtener(ced_x)
         if not x:
             return []
         res = []
-        stack = list(x.hijos)
-        while stack:
-            ced = stack.pop()
+        cola = deque(x.hijos)
+        vistos: Set[str] = set()
+        while cola:
+            ced = cola.popleft()
+            if ced in vistos:
+                continue
+            vistos.add(ced)
             p = fam.obtener(ced)
             if p:
                 if p.vivo:
                     res.append(p)
-                stack.extend(p.hijos)
+                # Filtrar al encolar: los ya visitados no engordan la cola
+                cola.extend(h for h in p.hijos if h not in vistos)
         return res
 
     def nacidos_ultimos_10_anios(self, fam: Familia) -> List[Persona]:
-        cutoff = self.fecha_simulada.replace(year=self.fecha_simulada.year - 10)
-        return [p for p in fam.todas_personas() if p.fecha_nacimiento >= cutoff]
+        f = self.fecha_simulada
+        try:
+            cutoff = f.replace(year=f.year - 10)
+        except ValueError:  # 29 de febrero hacia un año no bisiesto
+            cutoff = f.replace(year=f.year - 10, day=28)
+        i = bisect_left(fam._por_nacimiento, (cutoff.toordinal(), ""))
+        miembros = fam.miembros
+        return [miembros[c] for _, c in fam._por_nacimiento[i:]]
 
     def parejas_con_mas_de_dos_hijos(self, fam: Familia) -> List[Tuple[Persona, Persona]]:
-        res = []
-        vistos = set()
-        for p in fam.todas_personas():
-            for ced_par in p.parejas:
-                if (p.cedula, ced_par) in vistos or (ced_par, p.cedula) in vistos:
-                    continue
-                pareja = fam.obtener(ced_par)
-                if not pareja:
-                    continue
-                hijos_comunes = p.hijos.intersection(pareja.hijos)
-                if len(hijos_comunes) >= 2:
-                    res.append((p, pareja))
-                vistos.add((p.cedula, ced_par))
-        return res
+        # El contador incremental por unión ya tiene la respuesta: filtrar
+        # el dict sin intersecciones de sets en tiempo de consulta
+        get = fam.miembros.get
+        return [(get(c1), get(c2))
+                for (c1, c2), n in fam.hijos_comunes.items() if n >= 2]
 
     def fallecidos_antes_de_50(self, fam: Familia) -> List[Persona]:
-        res = []
-        for p in fam.todas_personas():
-            if p.fecha_fallecimiento:
-                if anios_entre(p.fecha_nacimiento, p.fecha_fallecimiento) < 50:
-                    res.append(p)
-        return res
+        # El índice incremental de la familia ya tiene la respuesta:
+        # O(|resultado|) en lugar de recorrer a todos los miembros
+        get = fam.miembros.get
+        return [get(c) for c in fam._fallecidos_antes_50]
 
     # ---- Simulación temporal y eventos cada 10s ----
     def tick_diario(self, dias: int = 1):
-        # Avanza la fecha simulada
+        # Avanza la fecha simulada; las edades cambian, así que los índices
+        # de compatibilidad cacheados dejan de ser válidos
         self.fecha_simulada += timedelta(days=dias)
-
-    def evento_cada_10s(self, id_familia: str):
+        self._scores_union.clear()
+
+    def avanzar_anio(self):
+        """Avanza la fecha simulada exactamente un año calendario.
+
+        Sustituye al salto de 365 días del tick: sin timedelta ni
+        normalización de fechas, y sin el corrimiento gradual del día
+        del mes que introducían los años bisiestos.
+        """
+        f = self.fecha_simulada
+        try:
+            self.fecha_simulada = f.replace(year=f.year + 1)
+        except ValueError:  # 29 de febrero en año no bisiesto
+            self.fecha_simulada = f.replace(year=f.year + 1, day=28)
+        self._scores_union.clear()
+
+    def evento_cada_10s(self, id_familia: str) -> bool:
+        """Corre un tick de simulación; devuelve True si hubo mutaciones.
+
+        El valor permite a la UI saltarse los chequeos de redibujo en los
+        ticks tranquilos (sin muertes, uniones ni nacimientos).
+        """
         fam = self.get_familia(id_familia)
         if not fam:
-            return
-        # 1) Cumpleaños: +1 año en fecha de nacimiento -> lo simulamos aumentando un día
-        self.tick_diario(365)  # avanzar un año de una sola vez por practicidad
+            return False
+        rev0 = fam.revision
+        # 1) Cumpleaños: avanzar un año calendario exacto por tick
+        self.avanzar_anio()
+        # Edades precalculadas una sola vez para todo el tick
+        edades = self._edades(fam)
         # 2) Fallecimientos aleatorios (solo vivos)
-        for p in fam.todas_personas():
-            if not p.vivo:
-                continue
-            # probabilidad base de muerte varía según edad + salud emocional
-            base = 0.001 + (p.edad(self.fecha_simulada) / 1200.0)  # crece con la edad
-            base += (50 - p.salud_emocional) / 10000.0
-            if random.random() < base:
-                p.marcar_fallecido(self.fecha_simulada)
+        # Una sola pasada con constantes y funciones ligadas a locales: el
+        # umbral se evalúa en línea sin construir lista intermedia (el
+        # modelo se mantiene sólo-stdlib, sin JIT ni vectorización externa).
+        rand = self.rng.random
+        inv_1200, inv_10000 = INV_1200, INV_10000
+        fecha = self.fecha_simulada
+        miembros = fam.miembros
+        vivos = [miembros[c] for c in fam.vivos]
+        # Columna de edades alineada con `vivos`: el umbral lee un entero
+        # por posición en vez de hacer un hash de cédula por persona
+        edades_vivos = [edades[p.cedula] for p in vivos]
+        for p, edad_p in zip(vivos, edades_vivos):
+            # probabilidad base de muerte crece con la edad y baja salud emocional
+            if rand() < 0.001 + edad_p * inv_1200 + (50 - p.salud_emocional) * inv_10000:
+                fam.registrar_fallecimiento(p, fecha)
                 self.gestionar_viudez(fam, p)
-        # 3) Uniones de pareja posibles
-        vivos = [q for q in fam.todas_personas() if q.vivo]
-        random.shuffle(vivos)
-        for i in range(0, len(vivos), 2):
-            if i + 1 < len(vivos):
-                a, b = vivos[i], vivos[i + 1]
-                # Menor prob si viudos recientemente (simulamos con estado civil)
-                if a.estado_civil in ("Soltero(a)", "Divorciado(a)", "Viudo(a)") and \
-                   b.estado_civil in ("Soltero(a)", "Divorciado(a)", "Viudo(a)"):
-                    if a.es_compatible_para_union(b) and random.random() < 0.25:
-                        self.unir_pareja(id_familia, a.cedula, b.cedula)
-        # 4) Nacimientos en parejas compatibles
-        parejas = []
-        for p in fam.todas_personas():
-            for ced_par in p.parejas:
-                if p.cedula < ced_par:  # evitar duplicado de tuplas
-                    parejas.append((p, fam.obtener(ced_par)))
-        for a, b in parejas:
-            if not a or not b:
+        # 3) Uniones de pareja posibles: emparejar por mayor índice de compatibilidad
+        # en lugar de barajar y probar pares al azar (la mayoría fallaba las reglas).
+        # Selección de solteros y su columna de edades en una sola pasada
+        # sobre las columnas ya alineadas del paso de mortalidad: el doble
+        # bucle de abajo indexa enteros en vez de hashear cédulas por par
+        solteros: List[Persona] = []
+        edades_solteros: List[int] = []
+        for q, e in zip(vivos, edades_vivos):
+            if q.vivo and q.estado_civil in SIN_PAREJA:
+                solteros.append(q)
+                edades_solteros.append(e)
+        n_solteros = len(solteros)
+        candidatos_union: List[Tuple[int, Persona, Persona]] = []
+        for i, a in enumerate(solteros):
+            edad_a = edades_solteros[i]
+            for j in range(i + 1, n_solteros):
+                indice = self._indice_union(a, solteros[j], edad_a, edades_solteros[j])
+                if indice >= 70:
+                    candidatos_union.append((indice, a, solteros[j]))
+        candidatos_union.sort(key=lambda t: t[0], reverse=True)
+        emparejados: Set[str] = set()
+        for _, a, b in candidatos_union:
+            if a.cedula in emparejados or b.cedula in emparejados:
                 continue
+            # Menor prob si viudos recientemente (simulamos con estado civil)
+            if rand() < 0.25:
+                self.unir_pareja(id_familia, a.cedula, b.cedula)
+                emparejados.add(a.cedula)
+                emparejados.add(b.cedula)
+        # 4) Nacimientos en parejas compatibles: el índice de uniones ya
+        # tiene cada pareja una sola vez (copia porque los nacimientos no
+        # tocan el índice, pero la intención queda explícita)
+        for c1, c2 in list(fam.uniones):
+            a, b = miembros[c1], miembros[c2]
             # Prob de tener hijo menor con la edad y estado civil (casados/unión libre)
-            if a.edad(self.fecha_simulada) <= 45 and b.edad(self.fecha_simulada) <= 45:
-                if random.random() < 0.15:
+            if edades[a.cedula] <= 45 and edades[b.cedula] <= 45:
+                if rand() < 0.15:
                     self.registrar_nacimiento_de_pareja(id_familia, a.cedula, b.cedula)
         # 5) Efectos colaterales
-        self.reasignar_tutoria_menores(fam)
+        self.reasignar_tutoria_menores(fam, edades)
+        return fam.revision != rev0
 
 
 __all__ = [
@@ -13,10 +13,18 @@ Requiere:
 from __future__ import annotations
 import tkinter as tk
 import customtkinter as ctk
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from tkinter import messagebox
 from typing import Dict, Optional, List, Tuple
 from datetime import date
 
+try:
+    from PIL import Image, ImageDraw, ImageTk
+except ImportError:  # Pillow es opcional: sin él siempre se usan ítems de canvas
+    Image = ImageDraw = ImageTk = None
+
 from genealogia_core import (
     Persona, Familia, ArbolGenealogico,
     PROVINCIAS_CR, ESTADOS_CIVILES, GENEROS, AFINIDADES,
@@ -34,36 +42,83 @@ PALETTE = {
     "text": "#ffffff"        # texto
 }
 
+# Cache módulo-global de conversiones hex -> RGB (la paleta es fija, así
+# que cada color se parsea una única vez en la vida del proceso)
+_HEX_RGB: Dict[str, Tuple[int, int, int]] = {}
+
+
+def _hex_to_rgb(hx: str) -> Tuple[int, int, int]:
+    rgb = _HEX_RGB.get(hx)
+    if rgb is None:
+        s = hx.lstrip('#')
+        rgb = _HEX_RGB[hx] = (int(s[0:2], 16), int(s[2:4], 16), int(s[4:6], 16))
+    return rgb
+
+
 class GradientCanvas(tk.Canvas):
     """Canvas con gradiente vertical usando únicamente stdlib."""
     def __init__(self, master, start=PALETTE["bg"], end=PALETTE["bg_dark"], **kw):
         super().__init__(master, highlightthickness=0, bd=0, **kw)
         self.start, self.end = start, end
-        self.bind("<Configure>", self._draw)
-
-    def _hex_to_rgb(self, hx):
-        hx = hx.lstrip('#')
-        return tuple(int(hx[i:i+2], 16) for i in (0, 2, 4))
-
-    def _interp(self, c1, c2, t):
-        return tuple(int(c1[i] + (c2[i]-c1[i]) * t) for i in range(3))
-
-    def _rgb_to_hex(self, rgb):
-        return "#%02x%02x%02x" % rgb
+        self._redraw_id: Optional[str] = None
+        # Cache de bitmaps renderizados: <Configure> también dispara por
+        # foco/reparenting sin cambio de tamaño, y minimizar/restaurar
+        # alterna entre dos tamaños (de ahí las 2 entradas)
+        self._img_cache: Dict[tuple, tk.PhotoImage] = {}
+        self._img: Optional[tk.PhotoImage] = None
+        self.bind("<Configure>", self._on_configure)
+
+    def _on_configure(self, _evt=None):
+        # Coalescer ráfagas de <Configure>: programar a lo sumo un redibujo
+        # en la cola idle de Tk por gesto de redimensionado
+        if self._redraw_id is None:
+            self._redraw_id = self.after_idle(self._do_draw)
+
+    def _do_draw(self):
+        self._redraw_id = None
+        self._draw()
 
     def _draw(self, _evt=None):
-        self.delete("grad")
         w, h = self.winfo_width(), self.winfo_height()
-        c1, c2 = self._hex_to_rgb(self.start), self._hex_to_rgb(self.end)
-        steps = max(2, h)
-        for i in range(steps):
-            t = i / (steps-1)
-            color = self._rgb_to_hex(self._interp(c1, c2, t))
-            self.create_line(0, i, w, i, fill=color, tags=("grad",))
+        if w <= 0 or h <= 0:
+            return
+        key = (w, h, self.start, self.end)
+        img = self._img_cache.get(key)
+        if img is None:
+            c1, c2 = _hex_to_rgb(self.start), _hex_to_rgb(self.end)
+            # Gradiente como PPM binario (P6): un píxel interpolado por fila,
+            # replicado a lo ancho con bytes * w (copia en C), y el bitmap
+            # completo entra a Tk en una sola llamada vía data=.
+            r1, g1, b1 = c1
+            dr, dg, db = c2[0] - r1, c2[1] - g1, c2[2] - b1
+            denom = max(1, h - 1)
+            filas = b"".join(bytes((r1 + dr * i // denom,
+                                    g1 + dg * i // denom,
+                                    b1 + db * i // denom)) * w
+                             for i in range(h))
+            img = tk.PhotoImage(data=b"P6 %d %d 255\n" % (w, h) + filas)
+            while len(self._img_cache) >= 2:
+                self._img_cache.pop(next(iter(self._img_cache)))
+            self._img_cache[key] = img
+        elif self._img is img:
+            return  # <Configure> sin cambio real de tamaño: nada que pintar
+        self.delete("grad")
+        self.create_image(0, 0, anchor="nw", image=img, tags=("grad",))
+        self._img = img  # referencia viva: Tk no retiene la imagen por sí solo
 
 # ---- Helpers de estilo para widgets ----
 PLACEHOLDER = "#9fb3c8"
 
+# Estilo común de botones de acento, precomputado una vez a nivel de módulo
+# Constantes del dibujo del árbol: el bucle de nodos las lee como
+# globales simples en vez de armar dicts/tuplas por redibujo
+COLOR_VIVO = "#01c38e"
+COLOR_FALLECIDO = "#2b3a4d"
+FONT_NODO = ("Segoe UI", 10)
+
+BTN_STYLE = dict(fg_color=PALETTE["accent"], hover_color="#00a67a", text_color="#0b1220")
+SIDEBAR_BTN = dict(corner_radius=18, **BTN_STYLE)
+
 def entry(parent, **kw):
     # Mezcla valores por defecto con los provistos en la llamada
     defaults = dict(
@@ -88,10 +143,30 @@ def omenu(parent, **kw):
     defaults.update(kw)
     return ctk.CTkOptionMenu(parent, **defaults)
 
+def _sync_listbox(lst: tk.Listbox, viejo: List[str], nuevo: List[str]):
+    """Aplica al Listbox sólo las filas que cambiaron respecto al render anterior.
+
+    Evita el patrón delete(0, END) + reinsertar todo (una llamada Tcl por
+    fila); las filas nuevas al final entran en un único insert con varargs.
+    """
+    comun = min(len(viejo), len(nuevo))
+    for i in range(comun):
+        if viejo[i] != nuevo[i]:
+            lst.delete(i)
+            lst.insert(i, nuevo[i])
+    if len(nuevo) > comun:
+        lst.insert(tk.END, *nuevo[comun:])
+    elif len(viejo) > comun:
+        lst.delete(comun, tk.END)
+
+
 # ------------------------------- UI (CustomTkinter) -------------------------------
 class App(ctk.CTk):
     REFRESH_MS = 1000           # 1s
     EVENTO_CADA = 10            # 10s
+    # A partir de cuántas personas el árbol se compone offscreen (Pillow)
+    # y se sube como un único bitmap en vez de ítems de canvas
+    UMBRAL_ARBOL_BITMAP = 150
 
     def __init__(self):
         super().__init__()
@@ -109,9 +184,40 @@ class App(ctk.CTk):
         self.modelo = ArbolGenealogico()
 
         # Estado
-        self.familia_activa: Optional[str] = None
+        self._familia_activa: Optional[str] = None
+        self._fam: Optional[Familia] = None
         self.segundos = 0
 
+        # Último contenido renderizado de cada Listbox (para deltas)
+        self._filas_familias: List[str] = []
+        self._filas_personas: List[str] = []
+
+        # Firma del último render de personas: si el contenido visible no
+        # cambió, el refresco retorna sin ordenar ni formatear nada
+        self._personas_firma: Optional[int] = None
+
+        # Revisión de familia ya volcada al historial (gating del tick)
+        self._last_rev_hist = -1
+
+        # Último texto aplicado por etiqueta (evitar configure redundantes)
+        self._ultimo_texto: Dict[int, str] = {}
+
+        # Fecha simulada ya formateada (sólo avanza en el tick de eventos)
+        self._fecha_mostrada: Optional[date] = None
+        self._fecha_texto = ""
+
+        # Pool para consultas pesadas: los recorridos corren fuera del hilo
+        # de Tk y el resultado vuelve al event loop vía after()
+        self._executor = ThreadPoolExecutor(max_workers=2)
+
+        # Ejecutor de un solo hilo para el paso de simulación + candado del
+        # modelo: serializa la mutación frente a las consultas en el pool
+        # y frente a los handlers/redibujos del hilo de Tk. RLock porque
+        # los caminos de refresco del hilo de Tk se anidan (_show llama a
+        # los mismos refrescos que _flush_sucias)
+        self._sim_executor = ThreadPoolExecutor(max_workers=1)
+        self._model_lock = threading.RLock()
+
         # Layout minimalista: sidebar + main
         # Layout minimalista: sidebar + main (grid)
         self.grid_rowconfigure(0, weight=1)
@@ -131,12 +237,65 @@ class App(ctk.CTk):
         # Sidebar content
         self._build_sidebar()
 
+        # Cache de layout del árbol por familia: (revision, niveles,
+        # por_nivel, niveles_ordenados). La revision de Familia ya invalida
+        # los recorridos del modelo; aquí cumple el mismo papel de firma
+        # barata para BFS + agrupado + ordenado (las coordenadas dependen
+        # del ancho y sí se recalculan en cada dibujo).
+        self._layout_cache: Dict[str, Tuple[Tuple[int, int], Dict[str, int],
+                                            Dict[int, List[Persona]], List[int]]] = {}
+
+        # Coalescencia de refrescos: los manejadores sólo marcan vistas
+        # sucias y un único job en idle las refresca una vez por ciclo
+        self._vistas_sucias: set = set()
+        self._flush_programado = False
+
+        # Ítems persistentes del canvas del árbol: en redibujos sucesivos se
+        # mueven con coords/itemconfig en lugar de borrar y recrear todo
+        self._node_items: Dict[str, Tuple[int, int]] = {}          # cedula -> (rect, texto)
+        self._edge_items: Dict[Tuple[str, str], int] = {}          # (padre, hijo) -> línea
+        self._tree_photo = None                                    # bitmap del árbol (familias grandes)
+        # Free-lists de ítems ocultos: al desaparecer una persona/arista su
+        # ítem se oculta y se recicla, en vez de delete + create en Tcl
+        self._free_nodes: List[Tuple[int, int]] = []
+        self._free_edges: List[int] = []
+
         # Main views (stack)
         self.frames: Dict[str, tk.Frame] = {}
+        self._current_view: Optional[tk.Frame] = None
         self._build_views()
 
-        # Tick
-        self.after(self.REFRESH_MS, self._tick)
+        # Dos cadenas de after independientes: el reloj (barato, corregido
+        # por deriva) y el motor de eventos (pesado, cadencia propia)
+        self._next_tick = time.monotonic() + self.REFRESH_MS / 1000
+        self._tick_id = self.after(self.REFRESH_MS, self._tick)
+        self._tick_eventos_id = self.after(self.EVENTO_CADA * 1000, self._tick_eventos)
+        # Cierre limpio: cancelar los after pendientes y apagar los pools
+        # antes de destruir la ventana (evita callbacks zombis sobre
+        # widgets ya desmontados)
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+
+    @property
+    def familia_activa(self) -> Optional[str]:
+        return self._familia_activa
+
+    @familia_activa.setter
+    def familia_activa(self, idf: Optional[str]):
+        # Resolver la Familia una sola vez al cambiar de selección: los
+        # handlers leen self._fam sin pasar por el dict del modelo
+        self._familia_activa = idf
+        self._fam = self.modelo.get_familia(idf) if idf else None
+
+    def _set_texto(self, widget, texto: str):
+        """configure(text=...) sólo cuando el texto realmente cambió.
+
+        Cada configure empuja un evento Tcl aunque el string sea idéntico;
+        con el tick de 1 Hz y los refrescos de consultas eso es puro ruido.
+        """
+        clave = id(widget)
+        if self._ultimo_texto.get(clave) != texto:
+            self._ultimo_texto[clave] = texto
+            widget.configure(text=texto)
 
     # ---------------- Sidebar ----------------
     def _build_sidebar(self):
@@ -146,18 +305,13 @@ class App(ctk.CTk):
         self.lbl_familia = ctk.CTkLabel(self.sidebar, text="(sin familia)", font=("Segoe UI", 12), text_color=PALETTE["text"])
         self.lbl_familia.pack(padx=20, pady=(0, 20), anchor="w")
 
-        def add_btn(text, cmd):
-            b = ctk.CTkButton(self.sidebar, text=text, command=cmd, corner_radius=18,
-                               fg_color=PALETTE["accent"], hover_color="#00a67a", text_color="#0b1220")
+        vistas = [("Familias", "familias"), ("Personas", "personas"),
+                  ("Relaciones", "relaciones"), ("Árbol", "arbol"),
+                  ("Búsquedas", "busquedas"), ("Historial", "historial")]
+        for texto, clave in vistas:
+            b = ctk.CTkButton(self.sidebar, text=texto,
+                              command=lambda k=clave: self._show(k), **SIDEBAR_BTN)
             b.pack(fill="x", padx=16, pady=6)
-            return b
-
-        add_btn("Familias", lambda: self._show("familias"))
-        add_btn("Personas", lambda: self._show("personas"))
-        add_btn("Relaciones", lambda: self._show("relaciones"))
-        add_btn("Árbol", lambda: self._show("arbol"))
-        add_btn("Búsquedas", lambda: self._show("busquedas"))
-        add_btn("Historial", lambda: self._show("historial"))
 
         self.lbl_tiempo = ctk.CTkLabel(self.sidebar, text="Tiempo: 0s", font=("Segoe UI", 11), text_color=PALETTE["text"])
         self.lbl_tiempo.pack(padx=16, pady=(16, 6), anchor="w")
@@ -167,26 +321,33 @@ class App(ctk.CTk):
 
     # ---------------- Views ----------------
     def _build_views(self):
-        self.frames["familias"] = self._view_familias(self.main)
-        self.frames["personas"] = self._view_personas(self.main)
-        self.frames["relaciones"] = self._view_relaciones(self.main)
-        self.frames["arbol"] = self._view_arbol(self.main)
-        self.frames["busquedas"] = self._view_busquedas(self.main)
-        self.frames["historial"] = self._view_historial(self.main)
+        # Constructores diferidos: cada vista se instancia en su primer
+        # _show, no en el arranque (cientos de widgets CTk menos de golpe)
+        self._view_builders = {
+            "familias": self._view_familias,
+            "personas": self._view_personas,
+            "relaciones": self._view_relaciones,
+            "arbol": self._view_arbol,
+            "busquedas": self._view_busquedas,
+            "historial": self._view_historial,
+        }
         self._show("familias")
 
-    def _clear_main(self):
-        for f in self.main.winfo_children():
-            f.pack_forget()
-
     def _show(self, key: str):
-        self._clear_main()
-        f = self.frames[key]
+        f = self.frames.get(key)
+        if f is None:
+            f = self.frames[key] = self._view_builders[key](self.main)
+        # sólo la vista actualmente empacada necesita pack_forget
+        if self._current_view is not None and self._current_view is not f:
+            self._current_view.pack_forget()
+        self._current_view = f
         f.pack(fill="both", expand=True)
         if key == "arbol":
             self._redibujar_arbol()
         elif key == "historial":
             self._refrescar_historial()
+        elif key == "personas":
+            self._refrescar_personas()
 
     # ---------------- View: Familias ----------------
     def _view_familias(self, parent) -> tk.Frame:
@@ -203,7 +364,7 @@ class App(ctk.CTk):
         self.nom_fam_var = tk.StringVar()
         entry(form, placeholder_text="ID familia", textvariable=self.id_fam_var).pack(side="left", padx=6)
         entry(form, placeholder_text="Nombre familia", textvariable=self.nom_fam_var, width=240).pack(side="left", padx=6)
-        ctk.CTkButton(form, text="Crear", command=self._crear_familia, fg_color=PALETTE["accent"], hover_color="#00a67a", text_color="#0b1220").pack(side="left", padx=6)
+        ctk.CTkButton(form, text="Crear", command=self._crear_familia, **BTN_STYLE).pack(side="left", padx=6)
 
         listf = ctk.CTkFrame(frame, fg_color=PALETTE["card"], corner_radius=16, border_color=PALETTE["stroke"], border_width=1)
         listf.pack(fill="both", expand=True, padx=16, pady=16)
@@ -223,7 +384,8 @@ class App(ctk.CTk):
             messagebox.showwarning("Validación", "Ingrese ID y nombre")
             return
         try:
-            self.modelo.crear_familia(idf, nom)
+            with self._model_lock:
+                self.modelo.crear_familia(idf, nom)
         except ValueError as e:
             messagebox.showerror("Error", str(e))
             return
@@ -232,9 +394,11 @@ class App(ctk.CTk):
         self.nom_fam_var.set("")
 
     def _refrescar_lista_familias(self):
-        self.lst_familias.delete(0, tk.END)
-        for fam in self.modelo.familias.values():
-            self.lst_familias.insert(tk.END, f"{fam.id_familia} • {fam.nombre} ({len(fam.miembros)} miembros)")
+        with self._model_lock:
+            filas = [f"{fam.id_familia} • {fam.nombre} ({len(fam.miembros)} miembros)"
+                     for fam in self.modelo.familias.values()]
+        _sync_listbox(self.lst_familias, self._filas_familias, filas)
+        self._filas_familias = filas
 
     def _seleccionar_familia(self, _evt=None):
         idx = self.lst_familias.curselection()
@@ -243,7 +407,7 @@ class App(ctk.CTk):
         seleccionado = self.lst_familias.get(idx[0])
         idf = seleccionado.split(" • ")[0]
         self.familia_activa = idf
-        self.lbl_familia.configure(text=f"Familia: {idf}")
+        self._set_texto(self.lbl_familia, f"Familia: {idf}")
         self._refrescar_personas()
 
     # ---------------- View: Personas ----------------
@@ -279,7 +443,7 @@ class App(ctk.CTk):
         omenu(row2, values=ESTADOS_CIVILES, variable=self.eciv_var, width=160).pack(side="left", padx=4)
         omenu(row2, values=AFINIDADES, variable=self.af1_var, width=160).pack(side="left", padx=4)
         omenu(row2, values=AFINIDADES, variable=self.af2_var, width=160).pack(side="left", padx=4)
-        ctk.CTkButton(row2, text="Agregar persona", command=self._agregar_persona, fg_color=PALETTE["accent"], hover_color="#00a67a", text_color="#0b1220").pack(side="left", padx=8)
+        ctk.CTkButton(row2, text="Agregar persona", command=self._agregar_persona, **BTN_STYLE).pack(side="left", padx=8)
 
         mid = ctk.CTkFrame(frame, fg_color=PALETTE["card"], corner_radius=16, border_color=PALETTE["stroke"], border_width=1)
         mid.pack(fill="both", expand=True, padx=16, pady=16)
@@ -313,24 +477,33 @@ class App(ctk.CTk):
             messagebox.showwarning("Validación", "Cédula y nombre son obligatorios")
             return
         try:
-            self.modelo.agregar_persona(self.familia_activa, p)
+            with self._model_lock:
+                self.modelo.agregar_persona(self.familia_activa, p)
         except ValueError as e:
             messagebox.showerror("Error", str(e))
             return
-        self._refrescar_personas()
+        self._marcar_sucio("personas")
         self.ced_var.set("")
         self.nom_var.set("")
 
     def _refrescar_personas(self):
-        if not self.familia_activa:
+        if not self.familia_activa or "personas" not in self.frames:
             return
-        fam = self.modelo.get_familia(self.familia_activa)
+        fam = self._fam
         if not fam:
             return
-        self.lst_personas.delete(0, tk.END)
-        for p in sorted(fam.todas_personas(), key=lambda x: x.nombre):
-            vivo = "🟢" if p.vivo else "⚫"
-            self.lst_personas.insert(tk.END, f"{vivo} {p.nombre} ({p.cedula}) • {p.edad(self.modelo.fecha_simulada)} años • {p.estado_civil}")
+        with self._model_lock:
+            fecha = self.modelo.fecha_simulada
+            firma = hash((fam.id_familia,) + tuple(
+                (p.cedula, p.nombre, p.vivo, p.estado_civil, p.edad(fecha))
+                for p in fam.miembros.values()))
+            if firma == self._personas_firma:
+                return
+            filas = [f"{'🟢' if p.vivo else '⚫'} {p.nombre} ({p.cedula}) • {p.edad(fecha)} años • {p.estado_civil}"
+                     for p in fam.miembros_por_nombre()]
+        _sync_listbox(self.lst_personas, self._filas_personas, filas)
+        self._filas_personas = filas
+        self._personas_firma = firma
 
     # ---------------- View: Relaciones ----------------
     def _view_relaciones(self, parent) -> tk.Frame:
@@ -345,8 +518,8 @@ class App(ctk.CTk):
         self.ced_b_var = tk.StringVar()
         entry(sec_union, placeholder_text="Cédula A", textvariable=self.ced_a_var, width=120).pack(side="left", padx=6)
         entry(sec_union, placeholder_text="Cédula B", textvariable=self.ced_b_var, width=120).pack(side="left", padx=6)
-        ctk.CTkButton(sec_union, text="Unir pareja", command=self._unir_pareja, fg_color=PALETTE["accent"], hover_color="#00a67a", text_color="#0b1220").pack(side="left", padx=6)
-        ctk.CTkButton(sec_union, text="Matrimonio", command=self._matrimonio, fg_color=PALETTE["accent"], hover_color="#00a67a", text_color="#0b1220").pack(side="left", padx=6)
+        ctk.CTkButton(sec_union, text="Unir pareja", command=self._unir_pareja, **BTN_STYLE).pack(side="left", padx=6)
+        ctk.CTkButton(sec_union, text="Matrimonio", command=self._matrimonio, **BTN_STYLE).pack(side="left", padx=6)
 
         # Padre-Hijo
         sec_ph = ctk.CTkFrame(frame, fg_color=PALETTE["card"], corner_radius=16, border_color=PALETTE["stroke"], border_width=1)
@@ -356,7 +529,7 @@ class App(ctk.CTk):
         self.ced_hijo_var = tk.StringVar()
         entry(sec_ph, placeholder_text="Cédula padre/madre", textvariable=self.ced_padre_var, width=160).pack(side="left", padx=6)
         entry(sec_ph, placeholder_text="Cédula hijo(a)", textvariable=self.ced_hijo_var, width=140).pack(side="left", padx=6)
-        ctk.CTkButton(sec_ph, text="Vincular", command=self._padre_hijo, fg_color=PALETTE["accent"], hover_color="#00a67a", text_color="#0b1220").pack(side="left", padx=6)
+        ctk.CTkButton(sec_ph, text="Vincular", command=self._padre_hijo, **BTN_STYLE).pack(side="left", padx=6)
 
         # Nacimiento de pareja
         sec_nac = ctk.CTkFrame(frame, fg_color=PALETTE["card"], corner_radius=16, border_color=PALETTE["stroke"], border_width=1)
@@ -366,34 +539,37 @@ class App(ctk.CTk):
         self.ced_pb_var = tk.StringVar()
         entry(sec_nac, placeholder_text="Cédula A", textvariable=self.ced_pa_var, width=120).pack(side="left", padx=6)
         entry(sec_nac, placeholder_text="Cédula B", textvariable=self.ced_pb_var, width=120).pack(side="left", padx=6)
-        ctk.CTkButton(sec_nac, text="Registrar nacimiento", command=self._nacimiento_pareja, fg_color=PALETTE["accent"], hover_color="#00a67a", text_color="#0b1220").pack(side="left", padx=6)
+        ctk.CTkButton(sec_nac, text="Registrar nacimiento", command=self._nacimiento_pareja, **BTN_STYLE).pack(side="left", padx=6)
 
         return frame
 
     def _unir_pareja(self):
         if not self.familia_activa:
             return
-        ok = self.modelo.unir_pareja(self.familia_activa, self.ced_a_var.get(), self.ced_b_var.get())
+        with self._model_lock:
+            ok = self.modelo.unir_pareja(self.familia_activa, self.ced_a_var.get(), self.ced_b_var.get())
         if not ok:
             messagebox.showinfo("Unión", "No fue posible unir (verifique compatibilidad y datos)")
         else:
             messagebox.showinfo("Unión", "Pareja unida")
-        self._refrescar_personas()
+        self._marcar_sucio("personas")
 
     def _matrimonio(self):
         if not self.familia_activa:
             return
-        ok = self.modelo.registrar_matrimonio(self.familia_activa, self.ced_a_var.get(), self.ced_b_var.get())
+        with self._model_lock:
+            ok = self.modelo.registrar_matrimonio(self.familia_activa, self.ced_a_var.get(), self.ced_b_var.get())
         if not ok:
             messagebox.showinfo("Matrimonio", "No fue posible registrar el matrimonio")
         else:
             messagebox.showinfo("Matrimonio", "Matrimonio registrado")
-        self._refrescar_personas()
+        self._marcar_sucio("personas")
 
     def _padre_hijo(self):
         if not self.familia_activa:
             return
-        ok = self.modelo.registrar_padre_hijo(self.familia_activa, self.ced_padre_var.get(), self.ced_hijo_var.get())
+        with self._model_lock:
+            ok = self.modelo.registrar_padre_hijo(self.familia_activa, self.ced_padre_var.get(), self.ced_hijo_var.get())
         if not ok:
             messagebox.showinfo("Parentesco", "No fue posible vincular padre-hijo")
         else:
@@ -402,12 +578,13 @@ class App(ctk.CTk):
     def _nacimiento_pareja(self):
         if not self.familia_activa:
             return
-        p = self.modelo.registrar_nacimiento_de_pareja(self.familia_activa, self.ced_pa_var.get(), self.ced_pb_var.get())
+        with self._model_lock:
+            p = self.modelo.registrar_nacimiento_de_pareja(self.familia_activa, self.ced_pa_var.get(), self.ced_pb_var.get())
         if not p:
             messagebox.showinfo("Nacimiento", "No fue posible registrar el nacimiento")
         else:
             messagebox.showinfo("Nacimiento", f"Nació {p.nombre} ({p.cedula})")
-        self._refrescar_personas()
+        self._marcar_sucio("personas")
 
     # ---------------- View: Árbol (Canvas) ----------------
     def _view_arbol(self, parent) -> tk.Frame:
@@ -415,77 +592,209 @@ class App(ctk.CTk):
         ctk.CTkLabel(frame, text="Árbol genealógico", font=("Segoe UI", 18, "bold"), text_color=PALETTE["text"]).pack(anchor="w", padx=16, pady=16)
         self.canvas_arbol = tk.Canvas(frame, bg=PALETTE["card"], highlightthickness=0)
         self.canvas_arbol.pack(fill="both", expand=True, padx=16, pady=16)
+        # Tamaño cacheado desde <Configure>: el redibujo lee una tupla
+        # Python en vez de hacer dos round-trips winfo_* a Tcl
+        self._arbol_size = (0, 0)
+        self.canvas_arbol.bind(
+            "<Configure>", lambda e: setattr(self, "_arbol_size", (e.width, e.height)))
         return frame
 
     def _layout_generacional(self, fam: Familia) -> Dict[str, int]:
         """Asigna nivel (generación) por BFS desde ancestros sin padres."""
-        nivel: Dict[str, int] = {}
-        # raíces = quienes no tienen padres o padres fuera de familia
-        raices = [p for p in fam.todas_personas() if not p.padres]
-        queue: List[Tuple[str, int]] = [(p.cedula, 0) for p in raices]
-        for p in fam.todas_personas():
-            if p.padres and all((fam.obtener(c) is None) for c in p.padres):
-                queue.append((p.cedula, 0))
-        seen = set()
-        while queue:
-            ced, niv = queue.pop(0)
-            if ced in seen:
-                continue
-            seen.add(ced)
-            nivel[ced] = min(niv, nivel.get(ced, niv))
-            pers = fam.obtener(ced)
-            if pers:
+        # miembros es el dict autoritativo del modelo: pertenencia y lookup
+        # ligados a locales para no repetir la resolución de atributos
+        miembros = fam.miembros
+        get = miembros.get
+        # raíces = quienes no tienen padres o padres fuera de familia;
+        # isdisjoint corre en C sobre la vista del dict y corta al primer
+        # padre presente, sin generador all(...) por persona
+        actuales = [p.cedula for p in miembros.values()
+                    if not p.padres or p.padres.isdisjoint(miembros)]
+        nivel: Dict[str, int] = dict.fromkeys(actuales, 0)
+        niv = 0
+        # BFS nivel por nivel: el primer descubrimiento fija la generación,
+        # así no hay re-encolados por cada padre ni set de vistos aparte
+        while actuales:
+            niv += 1
+            siguientes: List[str] = []
+            for ced in actuales:
+                pers = get(ced)
+                if not pers:
+                    continue
                 for h in pers.hijos:
-                    queue.append((h, niv + 1))
+                    if h not in nivel:
+                        nivel[h] = niv
+                        siguientes.append(h)
+            actuales = siguientes
         return nivel
 
-    def _redibujar_arbol(self):
-        self.canvas_arbol.delete("all")
-        if not self.familia_activa:
-            return
-        fam = self.modelo.get_familia(self.familia_activa)
-        if not fam or not fam.miembros:
-            return
+    def _layout_cacheado(self, fam: Familia) -> Tuple[Dict[int, List[Persona]], List[int]]:
+        """Agrupado por generación (ya ordenado), recalculado sólo si cambió el parentesco.
+
+        La clave combina el contador de linaje con el número de miembros:
+        muertes y uniones no mueven a nadie de lugar, así que no tiran el
+        layout; altas y nuevos vínculos sí lo recalculan.
+        """
+        clave = (fam.revision_linaje, len(fam.miembros))
+        entrada = self._layout_cache.get(fam.id_familia)
+        if entrada is not None and entrada[0] == clave:
+            return entrada[2], entrada[3]
         niveles = self._layout_generacional(fam)
-        # agrupar por nivel
         por_nivel: Dict[int, List[Persona]] = {}
         for ced, niv in niveles.items():
             p = fam.obtener(ced)
             if p:
                 por_nivel.setdefault(niv, []).append(p)
-        # ordenar por nombre
         for niv in por_nivel:
             por_nivel[niv].sort(key=lambda x: x.nombre)
+        niveles_ordenados = sorted(por_nivel.keys())
+        self._layout_cache[fam.id_familia] = (clave, niveles, por_nivel, niveles_ordenados)
+        return por_nivel, niveles_ordenados
+
+    def _redibujar_arbol(self):
+        # candado del modelo: el paso de simulación corre en _sim_executor
+        # y este recorrido itera miembros/hijos en el hilo de Tk
+        with self._model_lock:
+            self._redibujar_arbol_impl()
+
+    def _redibujar_arbol_impl(self):
+        fam = self._fam
+        if not fam or not fam.miembros:
+            self.canvas_arbol.delete("all")
+            self._node_items.clear()
+            self._edge_items.clear()
+            self._free_nodes.clear()
+            self._free_edges.clear()
+            return
+        por_nivel, niveles_ordenados = self._layout_cacheado(fam)
 
-        w = self.canvas_arbol.winfo_width() or 800
+        w = self._arbol_size[0] or 800
         box_w, box_h = 150, 40
+        half_w = box_w // 2
         vgap = 80
-        colors = {True: "#01c38e", False: "#2b3a4d"}
 
         pos: Dict[str, Tuple[int, int]] = {}
-        niveles_ordenados = sorted(por_nivel.keys())
+        cajas: List[Tuple[Persona, int, int]] = []
         for i, niv in enumerate(niveles_ordenados):
             fila = por_nivel[niv]
             n = len(fila)
             if n == 0:
                 continue
-            total_w = n * box_w + (n - 1) * 20
-            x0 = (w - total_w) // 2
+            paso = box_w + 20
+            x0 = (w - (n * paso - 20)) // 2
             y = 40 + i * (box_h + vgap)
-            for j, p in enumerate(fila):
-                x = x0 + j * (box_w + 20)
-                pos[p.cedula] = (x, y)
-                # caja
-                self.canvas_arbol.create_rectangle(x, y, x + box_w, y + box_h, fill=colors[p.vivo], outline=PALETTE["stroke"], width=1)
-                self.canvas_arbol.create_text(x + 8, y + 8, anchor="nw", fill=PALETTE["text"], font=("Segoe UI", 11, "bold"), text=p.nombre)
-                self.canvas_arbol.create_text(x + 8, y + 24, anchor="nw", fill="#c9d4df", font=("Segoe UI", 9), text=f"{p.edad(self.modelo.fecha_simulada)} años")
+            # las x de la fila salen de un range con paso fijo: sin
+            # multiplicación por caja en Python
+            # pos guarda (centro x, y superior, y inferior): las aristas
+            # desempacan la tupla sin rehacer las sumas por cada hijo
+            for p, x in zip(fila, range(x0, x0 + n * paso, paso)):
+                pos[p.cedula] = (x + half_w, y, y + box_h)
+                cajas.append((p, x, y))
+
+        if Image is not None and len(cajas) > self.UMBRAL_ARBOL_BITMAP:
+            self._dibujar_arbol_bitmap(fam, cajas, pos, w, box_w, box_h)
+            return
+        if self._tree_photo is not None:
+            # veníamos del modo bitmap: volver a ítems de canvas
+            self.canvas_arbol.delete("bitmap_arbol")
+            self._tree_photo = None
+
+        # Métodos del canvas y estado caliente ligados a locales para los
+        # dos bucles (nodos y aristas): LOAD_FAST en vez de LOAD_ATTR
+        cv = self.canvas_arbol
+        cv_coords, cv_itemconfig = cv.coords, cv.itemconfig
+        cv_create_line = cv.create_line
+        node_items, free_nodes = self._node_items, self._free_nodes
+        edge_items, free_edges = self._edge_items, self._free_edges
+        fecha = self.modelo.fecha_simulada
+        for p, x, y in cajas:
+            # caja + texto (nombre y edad en un solo ítem)
+            texto = f"{p.nombre}\n{p.edad(fecha)} años"
+            color = COLOR_VIVO if p.vivo else COLOR_FALLECIDO
+            items = node_items.get(p.cedula)
+            if items is None:
+                if free_nodes:
+                    rect, txt = free_nodes.pop()
+                    cv_itemconfig(rect, state="normal", fill=color)
+                    cv_itemconfig(txt, state="normal", text=texto)
+                    cv_coords(rect, x, y, x + box_w, y + box_h)
+                    cv_coords(txt, x + 8, y + 6)
+                else:
+                    rect = cv.create_rectangle(x, y, x + box_w, y + box_h, fill=color, outline=PALETTE["stroke"], width=1)
+                    txt = cv.create_text(x + 8, y + 6, anchor="nw", fill=PALETTE["text"], font=FONT_NODO, text=texto)
+                node_items[p.cedula] = (rect, txt)
+            else:
+                rect, txt = items
+                cv_coords(rect, x, y, x + box_w, y + box_h)
+                cv_itemconfig(rect, fill=color)
+                cv_coords(txt, x + 8, y + 6)
+                cv_itemconfig(txt, text=texto)
         # líneas padres → hijos
         for p in fam.todas_personas():
+            ced_p = p.cedula
+            if ced_p not in pos:
+                continue
+            xm, _, ym = pos[ced_p]
             for h in p.hijos:
-                if p.cedula in pos and h in pos:
-                    x1, y1 = pos[p.cedula]
-                    x2, y2 = pos[h]
-                    self.canvas_arbol.create_line(x1 + box_w // 2, y1 + box_h, x2 + box_w // 2, y2, fill="#7a8ba0")
+                if h not in pos:
+                    continue
+                x2, y2, _ = pos[h]
+                coords = (xm, ym, x2, y2)
+                linea = edge_items.get((ced_p, h))
+                if linea is None:
+                    if free_edges:
+                        linea = free_edges.pop()
+                        cv_itemconfig(linea, state="normal")
+                        cv_coords(linea, *coords)
+                    else:
+                        linea = cv_create_line(*coords, fill="#7a8ba0")
+                    edge_items[(ced_p, h)] = linea
+                else:
+                    cv_coords(linea, *coords)
+        # ocultar y reciclar ítems de personas/aristas que salieron del dibujo
+        for ced in [c for c in self._node_items if c not in pos]:
+            rect, txt = self._node_items.pop(ced)
+            self.canvas_arbol.itemconfig(rect, state="hidden")
+            self.canvas_arbol.itemconfig(txt, state="hidden")
+            self._free_nodes.append((rect, txt))
+        for clave in [k for k in self._edge_items if k[0] not in pos or k[1] not in pos]:
+            linea = self._edge_items.pop(clave)
+            self.canvas_arbol.itemconfig(linea, state="hidden")
+            self._free_edges.append(linea)
+
+    def _dibujar_arbol_bitmap(self, fam: Familia, cajas, pos, w: int, box_w: int, box_h: int):
+        """Compone el árbol en una imagen Pillow y lo sube en un solo blit.
+
+        Para familias grandes, N ítems de canvas degradan cada redibujo;
+        un único create_image mantiene el costo en Tk constante.
+        """
+        if self._node_items or self._edge_items or self._free_nodes or self._free_edges:
+            self.canvas_arbol.delete("all")
+            self._node_items.clear()
+            self._edge_items.clear()
+            self._free_nodes.clear()
+            self._free_edges.clear()
+        h = max(self._arbol_size[1],
+                max(y for _, _, y in cajas) + box_h + 40)
+        img = Image.new("RGB", (w, h), PALETTE["card"])
+        d = ImageDraw.Draw(img)
+        # aristas primero, para que queden bajo las cajas
+        for p in fam.todas_personas():
+            if p.cedula not in pos:
+                continue
+            x1, _, y1 = pos[p.cedula]
+            for hj in p.hijos:
+                if hj in pos:
+                    x2, y2, _ = pos[hj]
+                    d.line((x1, y1, x2, y2), fill="#7a8ba0")
+        colors = {True: "#01c38e", False: "#2b3a4d"}
+        fecha = self.modelo.fecha_simulada
+        for p, x, y in cajas:
+            d.rectangle((x, y, x + box_w, y + box_h), fill=colors[p.vivo], outline=PALETTE["stroke"])
+            d.text((x + 8, y + 6), f"{p.nombre}\n{p.edad(fecha)} años", fill=PALETTE["text"])
+        self._tree_photo = ImageTk.PhotoImage(img)
+        self.canvas_arbol.delete("bitmap_arbol")
+        self.canvas_arbol.create_image(0, 0, anchor="nw", image=self._tree_photo, tags=("bitmap_arbol",))
 
     # ---------------- View: Búsquedas ----------------
     def _view_busquedas(self, parent) -> tk.Frame:
@@ -507,7 +816,7 @@ class App(ctk.CTk):
 
         # 1 relación A-B
         self.q1_a, self.q1_b, self.q1_out = row("1) Relación entre A y B")
-        ctk.CTkButton(frame, text="Consultar 1", command=self._q1, fg_color=PALETTE["accent"], hover_color="#00a67a", text_color="#0b1220").pack(anchor="w", padx=16)
+        ctk.CTkButton(frame, text="Consultar 1", command=self._q1, **BTN_STYLE).pack(anchor="w", padx=16)
 
         # 2 primos de X
         rf2 = ctk.CTkFrame(frame, fg_color=PALETTE["card"], corner_radius=16, border_color=PALETTE["stroke"], border_width=1)
@@ -517,7 +826,7 @@ class App(ctk.CTk):
         entry(rf2, placeholder_text="Cédula X", textvariable=self.q2_x, width=160).pack(side="left", padx=4)
         self.q2_out = ctk.CTkLabel(rf2, text="", anchor="w")
         self.q2_out.pack(side="left", padx=8)
-        ctk.CTkButton(frame, text="Consultar 2", command=self._q2, fg_color=PALETTE["accent"], hover_color="#00a67a", text_color="#0b1220").pack(anchor="w", padx=16)
+        ctk.CTkButton(frame, text="Consultar 2", command=self._q2, **BTN_STYLE).pack(anchor="w", padx=16)
 
         # 3 antepasados maternos
         rf3 = ctk.CTkFrame(frame, fg_color=PALETTE["card"], corner_radius=16, border_color=PALETTE["stroke"], border_width=1)
@@ -527,7 +836,7 @@ class App(ctk.CTk):
         entry(rf3, placeholder_text="Cédula X", textvariable=self.q3_x, width=160).pack(side="left", padx=4)
         self.q3_out = ctk.CTkLabel(rf3, text="", anchor="w")
         self.q3_out.pack(side="left", padx=8)
-        ctk.CTkButton(frame, text="Consultar 3", command=self._q3, fg_color=PALETTE["accent"], hover_color="#00a67a", text_color="#0b1220").pack(anchor="w", padx=16)
+        ctk.CTkButton(frame, text="Consultar 3", command=self._q3, **BTN_STYLE).pack(anchor="w", padx=16)
 
         # 4 descendientes vivos
         rf4 = ctk.CTkFrame(frame, fg_color=PALETTE["card"], corner_radius=16, border_color=PALETTE["stroke"], border_width=1)
@@ -537,7 +846,7 @@ class App(ctk.CTk):
         entry(rf4, placeholder_text="Cédula X", textvariable=self.q4_x, width=160).pack(side="left", padx=4)
         self.q4_out = ctk.CTkLabel(rf4, text="", anchor="w")
         self.q4_out.pack(side="left", padx=8)
-        ctk.CTkButton(frame, text="Consultar 4", command=self._q4, fg_color=PALETTE["accent"], hover_color="#00a67a", text_color="#0b1220").pack(anchor="w", padx=16)
+        ctk.CTkButton(frame, text="Consultar 4", command=self._q4, **BTN_STYLE).pack(anchor="w", padx=16)
 
         # 5 nacidos últimos 10 años
         rf5 = ctk.CTkFrame(frame, fg_color=PALETTE["card"], corner_radius=16, border_color=PALETTE["stroke"], border_width=1)
@@ -545,7 +854,7 @@ class App(ctk.CTk):
         ctk.CTkLabel(rf5, text="5) ¿Cuántos nacieron en los últimos 10 años?", width=260, anchor="w").pack(side="left")
         self.q5_out = ctk.CTkLabel(rf5, text="", anchor="w")
         self.q5_out.pack(side="left", padx=8)
-        ctk.CTkButton(frame, text="Consultar 5", command=self._q5, fg_color=PALETTE["accent"], hover_color="#00a67a", text_color="#0b1220").pack(anchor="w", padx=16)
+        ctk.CTkButton(frame, text="Consultar 5", command=self._q5, **BTN_STYLE).pack(anchor="w", padx=16)
 
         # 6 parejas con 2+ hijos
         rf6 = ctk.CTkFrame(frame, fg_color=PALETTE["card"], corner_radius=16, border_color=PALETTE["stroke"], border_width=1)
@@ -553,7 +862,7 @@ class App(ctk.CTk):
         ctk.CTkLabel(rf6, text="6) Parejas con 2+ hijos", width=260, anchor="w").pack(side="left")
         self.q6_out = ctk.CTkLabel(rf6, text="", anchor="w")
         self.q6_out.pack(side="left", padx=8)
-        ctk.CTkButton(frame, text="Consultar 6", command=self._q6, fg_color=PALETTE["accent"], hover_color="#00a67a", text_color="#0b1220").pack(anchor="w", padx=16)
+        ctk.CTkButton(frame, text="Consultar 6", command=self._q6, **BTN_STYLE).pack(anchor="w", padx=16)
 
         # 7 fallecidos < 50
         rf7 = ctk.CTkFrame(frame, fg_color=PALETTE["card"], corner_radius=16, border_color=PALETTE["stroke"], border_width=1)
@@ -561,58 +870,88 @@ class App(ctk.CTk):
         ctk.CTkLabel(rf7, text="7) Fallecidos antes de 50 años", width=260, anchor="w").pack(side="left")
         self.q7_out = ctk.CTkLabel(rf7, text="", anchor="w")
         self.q7_out.pack(side="left", padx=8)
-        ctk.CTkButton(frame, text="Consultar 7", command=self._q7, fg_color=PALETTE["accent"], hover_color="#00a67a", text_color="#0b1220").pack(anchor="w", padx=16)
+        ctk.CTkButton(frame, text="Consultar 7", command=self._q7, **BTN_STYLE).pack(anchor="w", padx=16)
 
         return frame
 
+    def _consulta_async(self, out, trabajo):
+        """Corre `trabajo` () -> str en el pool y publica el texto en `out`.
+
+        El callback del future se dispara en el hilo trabajador; after(0)
+        reencola la actualización de la etiqueta en el hilo de Tk.
+        """
+        def tarea():
+            with self._model_lock:
+                return trabajo()
+
+        future = self._executor.submit(tarea)
+
+        def publicar(f):
+            try:
+                texto = f.result()
+            except Exception as e:  # noqa: BLE001 - mostrar el error en la UI
+                texto = f"Error: {e}"
+            self.after(0, self._set_texto, out, texto)
+
+        future.add_done_callback(publicar)
+
     def _q1(self):
-        fam = self.modelo.get_familia(self.familia_activa) if self.familia_activa else None
+        fam = self._fam
         if not fam:
             return
-        self.q1_out.configure(text=self.modelo.relacion_entre(fam, self.q1_a.get(), self.q1_b.get()))
+        a, b = self.q1_a.get(), self.q1_b.get()
+        self._consulta_async(self.q1_out, lambda: self.modelo.relacion_entre(fam, a, b))
 
     def _q2(self):
-        fam = self.modelo.get_familia(self.familia_activa) if self.familia_activa else None
+        fam = self._fam
         if not fam:
             return
-        nombres = ", ".join(p.nombre for p in self.modelo.primos_primer_grado(fam, self.q2_x.get()))
-        self.q2_out.configure(text=nombres or "(ninguno)")
+        ced = self.q2_x.get()
+        self._consulta_async(
+            self.q2_out,
+            lambda: ", ".join(p.nombre for p in self.modelo.primos_primer_grado(fam, ced)) or "(ninguno)")
 
     def _q3(self):
-        fam = self.modelo.get_familia(self.familia_activa) if self.familia_activa else None
+        fam = self._fam
         if not fam:
             return
-        nombres = ", ".join(p.nombre for p in self.modelo.antepasados_maternos(fam, self.q3_x.get()))
-        self.q3_out.configure(text=nombres or "(ninguno)")
+        ced = self.q3_x.get()
+        self._consulta_async(
+            self.q3_out,
+            lambda: ", ".join(p.nombre for p in self.modelo.antepasados_maternos(fam, ced)) or "(ninguno)")
 
     def _q4(self):
-        fam = self.modelo.get_familia(self.familia_activa) if self.familia_activa else None
+        fam = self._fam
         if not fam:
             return
-        nombres = ", ".join(p.nombre for p in self.modelo.descendientes_vivos(fam, self.q4_x.get()))
-        self.q4_out.configure(text=nombres or "(ninguno)")
+        ced = self.q4_x.get()
+        self._consulta_async(
+            self.q4_out,
+            lambda: ", ".join(p.nombre for p in self.modelo.descendientes_vivos(fam, ced)) or "(ninguno)")
 
     def _q5(self):
-        fam = self.modelo.get_familia(self.familia_activa) if self.familia_activa else None
+        fam = self._fam
         if not fam:
             return
-        n = len(self.modelo.nacidos_ultimos_10_anios(fam))
-        self.q5_out.configure(text=f"{n}")
+        self._consulta_async(
+            self.q5_out, lambda: str(len(self.modelo.nacidos_ultimos_10_anios(fam))))
 
     def _q6(self):
-        fam = self.modelo.get_familia(self.familia_activa) if self.familia_activa else None
+        fam = self._fam
         if not fam:
             return
-        pares = self.modelo.parejas_con_mas_de_dos_hijos(fam)
-        txt = ", ".join(f"{a.nombre} & {b.nombre}" for a, b in pares) or "(ninguna)"
-        self.q6_out.configure(text=txt)
+        self._consulta_async(
+            self.q6_out,
+            lambda: ", ".join(f"{a.nombre} & {b.nombre}"
+                              for a, b in self.modelo.parejas_con_mas_de_dos_hijos(fam)) or "(ninguna)")
 
     def _q7(self):
-        fam = self.modelo.get_familia(self.familia_activa) if self.familia_activa else None
+        fam = self._fam
         if not fam:
             return
-        txt = ", ".join(p.nombre for p in self.modelo.fallecidos_antes_de_50(fam)) or "(ninguno)"
-        self.q7_out.configure(text=txt)
+        self._consulta_async(
+            self.q7_out,
+            lambda: ", ".join(p.nombre for p in self.modelo.fallecidos_antes_de_50(fam)) or "(ninguno)")
 
     # ---------------- View: Historial ----------------
     def _view_historial(self, parent) -> tk.Frame:
@@ -623,86 +962,239 @@ class App(ctk.CTk):
         top.pack(fill="x", padx=16, pady=6)
         self.hist_ced_var = tk.StringVar()
         entry(top, placeholder_text="Cédula", textvariable=self.hist_ced_var, width=180).pack(side="left", padx=6)
-        ctk.CTkButton(top, text="Ver historial", command=self._refrescar_historial, fg_color=PALETTE["accent"], hover_color="#00a67a", text_color="#0b1220").pack(side="left", padx=6)
+        ctk.CTkButton(top, text="Ver historial", command=self._refrescar_historial, **BTN_STYLE).pack(side="left", padx=6)
 
-        self.txt_hist = tk.Text(frame, height=14, bg=PALETTE["card"], fg=PALETTE["text"], insertbackground=PALETTE["text"], relief="flat")
+        # Vista de sólo lectura: sin pila de undo ni separadores automáticos
+        self.txt_hist = tk.Text(frame, height=14, undo=False, autoseparators=False,
+                                bg=PALETTE["card"], fg=PALETTE["text"], insertbackground=PALETTE["text"], relief="flat")
+        self.txt_hist.configure(state="disabled")
         self.txt_hist.pack(fill="both", expand=True, padx=16, pady=10)
 
         # Timeline visual simple
         self.canvas_timeline = tk.Canvas(frame, height=120, bg=PALETTE["card"], highlightthickness=0)
         self.canvas_timeline.pack(fill="x", padx=16, pady=(0, 16))
+        # ancho cacheado: winfo_width() consulta geometría en cada redibujo
+        self._tl_w = 800
+        self.canvas_timeline.bind("<Configure>", lambda e: setattr(self, "_tl_w", e.width))
+        # pool de ítems del timeline: la polilínea y las etiquetas se
+        # reposicionan con coords/itemconfig, el sobrante se oculta
+        self._tl_linea: Optional[int] = None
+        self._tl_labels: List[int] = []
+        # modo raster (Pillow): un único ítem de imagen cuyo photo se swapea
+        self._tl_img_id: Optional[int] = None
+        self._timeline_photo = None
 
         return frame
 
+    def _ocultar_timeline(self, desde: int = 0):
+        """Oculta la polilínea (si desde == 0) y las etiquetas desde `desde`."""
+        cv = self.canvas_timeline
+        if desde == 0 and self._tl_linea is not None:
+            cv.itemconfig(self._tl_linea, state="hidden")
+        if desde == 0 and self._tl_img_id is not None:
+            cv.itemconfig(self._tl_img_id, state="hidden")
+        for it in self._tl_labels[desde:]:
+            cv.itemconfig(it, state="hidden")
+
     def _refrescar_historial(self):
+        # habilitar sólo durante la actualización; deshabilitado suprime
+        # manejo de cursor y notificaciones <<Modified>> del Text
+        self.txt_hist.configure(state="normal")
+        try:
+            with self._model_lock:
+                self._refrescar_historial_impl()
+        finally:
+            self.txt_hist.configure(state="disabled")
+
+    def _refrescar_historial_impl(self):
         self.txt_hist.delete("1.0", tk.END)
-        self.canvas_timeline.delete("all")
         if not self.familia_activa:
+            self._ocultar_timeline()
             return
-        fam = self.modelo.get_familia(self.familia_activa)
+        fam = self._fam
         if not fam:
+            self._ocultar_timeline()
             return
         p = fam.obtener(self.hist_ced_var.get().strip()) if self.hist_ced_var.get().strip() else None
         if not p:
             self.txt_hist.insert(tk.END, "Ingrese cédula para ver historial\n")
+            self._ocultar_timeline()
             return
-        for anio, ev in sorted(p.historial):
-            self.txt_hist.insert(tk.END, f"{anio}: {ev}\n")
+        orden = p.historial_ordenado()
+        if orden:
+            self.txt_hist.insert(tk.END, p.historial_texto())
         # Timeline
-        if p.historial:
-            years = [a for a, _ in p.historial]
-            y_min, y_max = min(years), max(years)
-            w = self.canvas_timeline.winfo_width() or 800
-            margin = 40
-            self.canvas_timeline.create_line(margin, 60, w - margin, 60, fill="#7a8ba0")
-            span = max(1, y_max - y_min)
-            for anio, ev in sorted(p.historial):
-                x = margin + int((w - 2 * margin) * (anio - y_min) / span)
-                self.canvas_timeline.create_oval(x - 4, 56, x + 4, 64, fill=PALETTE["accent"], outline="")
-                self.canvas_timeline.create_text(x, 75, text=str(anio), fill="#c9d4df", font=("Segoe UI", 9))
-                self.canvas_timeline.create_text(x, 95, text=ev, fill=PALETTE["text"], font=("Segoe UI", 9))
+        if not orden:
+            self._ocultar_timeline()
+            return
+        cv = self.canvas_timeline
+        y_min, y_max = orden[0][0], orden[-1][0]
+        w = self._tl_w
+        margin = 40
+        span = max(1, y_max - y_min)
+        escala = (w - 2 * margin) / span
+        xs = [margin + int(escala * (anio - y_min)) for anio, _ in orden]
+        anios_str = p.historial_anios_str()
+        if Image is not None:
+            self._dibujar_timeline_bitmap(orden, anios_str, xs, w, margin)
+            return
+        # Eje + marcas en una única polilínea: los conectores corren
+        # sobre el propio eje (y=60), así toda la geometría entra en
+        # una sola llamada create_line (o un coords si ya existe)
+        puntos = [margin, 60]
+        for x in xs:
+            puntos += [x, 60, x, 54, x, 66, x, 60]
+        puntos += [w - margin, 60]
+        if self._tl_linea is None:
+            self._tl_linea = cv.create_line(*puntos, fill="#7a8ba0")
+        else:
+            cv.coords(self._tl_linea, *puntos)
+            cv.itemconfig(self._tl_linea, state="normal")
+        labels = self._tl_labels
+        for i, (x, (_, ev)) in enumerate(zip(xs, orden)):
+            texto = anios_str[i] + "\n" + ev
+            if i < len(labels):
+                cv.coords(labels[i], x, 86)
+                cv.itemconfig(labels[i], text=texto, state="normal")
+            else:
+                labels.append(cv.create_text(x, 86, text=texto, justify="center",
+                                             fill=PALETTE["text"], font=("Segoe UI", 9)))
+        for it in labels[len(orden):]:
+            cv.itemconfig(it, state="hidden")
+
+    def _dibujar_timeline_bitmap(self, orden, anios_str, xs, w: int, margin: int):
+        """Rasteriza el timeline con Pillow y lo sube como un único blit.
+
+        El costo en Tk queda constante sin importar el número de eventos;
+        sin Pillow sigue operando el pool de ítems vectoriales.
+        """
+        self._ocultar_timeline()
+        img = Image.new("RGB", (w, 120), PALETTE["card"])
+        d = ImageDraw.Draw(img)
+        d.line((margin, 60, w - margin, 60), fill="#7a8ba0")
+        for x, txt_anio, (_, ev) in zip(xs, anios_str, orden):
+            d.ellipse((x - 4, 56, x + 4, 64), fill=PALETTE["accent"])
+            d.text((x, 75), txt_anio, fill="#c9d4df", anchor="mm")
+            d.text((x, 95), ev, fill=PALETTE["text"], anchor="mm")
+        self._timeline_photo = ImageTk.PhotoImage(img)
+        if self._tl_img_id is None:
+            self._tl_img_id = self.canvas_timeline.create_image(
+                0, 0, anchor="nw", image=self._timeline_photo)
+        else:
+            self.canvas_timeline.itemconfig(self._tl_img_id,
+                                            image=self._timeline_photo, state="normal")
 
     # ---------------- Reloj / Motor de eventos ----------------
     def _tick(self):
         self.segundos += 1
-        self.lbl_tiempo.configure(text=f"Tiempo: {self.segundos}s")
-        self.lbl_fecha.configure(text=f"Fecha sim.: {self.modelo.fecha_simulada.isoformat()}")
-        if self.familia_activa and self.segundos % self.EVENTO_CADA == 0:
-            # Ejecutar eventos
-            self.modelo.evento_cada_10s(self.familia_activa)
-            # Refrescar vistas posibles
+        self._set_texto(self.lbl_tiempo, "Tiempo: %ds" % self.segundos)
+        fecha = self.modelo.fecha_simulada
+        if fecha is not self._fecha_mostrada:
+            # isoformat + concatenación sólo cuando la fecha avanzó
+            self._fecha_mostrada = fecha
+            self._fecha_texto = "Fecha sim.: " + fecha.isoformat()
+        self._set_texto(self.lbl_fecha, self._fecha_texto)
+        # Reprogramar descontando lo que tardó el handler, para que la
+        # cadencia no acumule deriva (REFRESH_MS + tiempo de redibujo)
+        self._next_tick += self.REFRESH_MS / 1000
+        delay = max(0, int((self._next_tick - time.monotonic()) * 1000))
+        self._tick_id = self.after(delay, self._tick)
+
+    def _tick_eventos(self):
+        if self.familia_activa:
+            # El trabajo pesado va a la cola idle: el reloj no espera por
+            # la simulación ni por los redibujos
+            self.after_idle(self._trabajo_eventos)
+        self._tick_eventos_id = self.after(self.EVENTO_CADA * 1000, self._tick_eventos)
+
+    def _trabajo_eventos(self):
+        if not self.familia_activa:
+            return
+        idf = self.familia_activa
+
+        def paso():
+            with self._model_lock:
+                return self.modelo.evento_cada_10s(idf)
+
+        fut = self._sim_executor.submit(paso)
+        fut.add_done_callback(
+            lambda f: self.after(0, self._refrescar_tras_eventos, f.result()))
+
+    def _refrescar_tras_eventos(self, cambio: bool = True):
+        fam = self._fam
+        # Las edades avanzan en cada tick, y tanto la lista de personas
+        # como los nodos del árbol las muestran: ambos se marcan siempre
+        # (la firma de contenido y las cachés de layout/ítems cortan el
+        # trabajo si nada cambió); historial sólo si el tick mutó la familia
+        self._marcar_sucio("personas")
+        self._marcar_sucio("arbol")
+        if not cambio or fam is None:
+            return
+        if fam.revision != self._last_rev_hist:
+            self._marcar_sucio("historial")
+
+    def _marcar_sucio(self, vista: str):
+        self._vistas_sucias.add(vista)
+        if not self._flush_programado:
+            self._flush_programado = True
+            self.after_idle(self._flush_sucias)
+
+    def _flush_sucias(self):
+        self._flush_programado = False
+        sucias, self._vistas_sucias = self._vistas_sucias, set()
+        fam = self._fam
+        rev = fam.revision if fam else -1
+        if "personas" in sucias:
             self._refrescar_personas()
-            if self.frames.get("arbol") and str(self.frames["arbol"].winfo_ismapped()):
-                self._redibujar_arbol()
-            if self.frames.get("historial") and str(self.frames["historial"].winfo_ismapped()):
-                self._refrescar_historial()
-        self.after(self.REFRESH_MS, self._tick)
-
-
-if __name__ == "__main__":
-    app = App()
+        # Árbol e historial sólo si la vista está montada y visible (el
+        # historial además gateado por revisión: sin mutaciones no se vuelca)
+        if "arbol" in sucias and self.frames.get("arbol") and self.frames["arbol"].winfo_viewable():
+            self._redibujar_arbol()
+        if "historial" in sucias and self.frames.get("historial") and self.frames["historial"].winfo_viewable():
+            self._refrescar_historial()
+            self._last_rev_hist = rev
+
+    def _on_close(self):
+        # Sin esto, los after encadenados siguen disparando contra widgets
+        # destruidos y cada excepción pasa por el reporte lento de Tk
+        for tid in (self._tick_id, self._tick_eventos_id):
+            try:
+                self.after_cancel(tid)
+            except Exception:
+                pass
+        self._executor.shutdown(wait=False)
+        self._sim_executor.shutdown(wait=False)
+        self.destroy()
+
+
+def _sembrar_demo(app: App):
     # Semilla de ejemplo opcional (se puede borrar)
     try:
-        app.modelo.crear_familia("F1", "Familia Demo")
-        app.familia_activa = "F1"
+        with app._model_lock:
+            app.modelo.crear_familia("F1", "Familia Demo")
+            app.familia_activa = "F1"
+            base_date = date(1985, 5, 10)
+            demo = [
+                Persona("101", "Ana", base_date, "Femenino", "San José", afinidades={"Arte", "Música"}),
+                Persona("102", "Luis", date(1982, 3, 2), "Masculino", "Alajuela", afinidades={"Deporte", "Viajes"}),
+                Persona("201", "Marta", date(1960, 7, 1), "Femenino", "Cartago", afinidades={"Lectura", "Gastronomía"}),
+                Persona("202", "Carlos", date(1958, 1, 20), "Masculino", "Cartago", afinidades={"Ciencia", "Lectura"}),
+            ]
+            app.modelo.agregar_personas_bulk("F1", demo)
+            # padres de Ana = Marta & Carlos
+            app.modelo.registrar_padres_hijos_bulk("F1", [("201", "101"), ("202", "101")])
+            # unir Ana & Luis
+            app.modelo.unir_pareja("F1", "101", "102")
         app.lbl_familia.configure(text="Familia: F1")
-        base_date = date(1985, 5, 10)
-        demo = [
-            Persona("101", "Ana", base_date, "Femenino", "San José", afinidades={"Arte", "Música"}),
-            Persona("102", "Luis", date(1982, 3, 2), "Masculino", "Alajuela", afinidades={"Deporte", "Viajes"}),
-            Persona("201", "Marta", date(1960, 7, 1), "Femenino", "Cartago", afinidades={"Lectura", "Gastronomía"}),
-            Persona("202", "Carlos", date(1958, 1, 20), "Masculino", "Cartago", afinidades={"Ciencia", "Lectura"}),
-        ]
-        for p in demo:
-            app.modelo.agregar_persona("F1", p)
-        # padres de Ana = Marta & Carlos
-        app.modelo.registrar_padre_hijo("F1", "201", "101")
-        app.modelo.registrar_padre_hijo("F1", "202", "101")
-        # unir Ana & Luis
-        app.modelo.unir_pareja("F1", "101", "102")
     except Exception:
         pass
-
     app._refrescar_lista_familias()
     app._refrescar_personas()
+
+
+if __name__ == "__main__":
+    app = App()
+    # Sembrar tras el primer frame: el mainloop arranca de inmediato y la
+    # carga de la demo no retrasa el primer pintado de la ventana
+    app.after(50, _sembrar_demo, app)
     app.mainloop()
@@ -19,10 +19,12 @@ from __future__ import annotations
 import customtkinter as ctk
 import tkinter as tk
 from tkinter import messagebox
+from bisect import insort
 from dataclasses import dataclass, field
 from typing import List, Dict, Optional, Set, Tuple
 from datetime import date, datetime, timedelta
 import random
+import time
 
 # ------------------------------- Datos base (listas para menús) -------------------------------
 PROVINCIAS_CR = [
@@ -54,7 +56,7 @@ def anios_entre(fecha: date, ref: Optional[date] = None) -> int:
     return max(0, y)
 
 
-@dataclass
+@dataclass(slots=True)
 class Persona:
     cedula: str
     nombre: str
@@ -89,7 +91,7 @@ class Persona:
 
     def registrar_evento(self, descripcion: str, fecha_ref: Optional[date] = None):
         f = fecha_ref or hoy()
-        self.historial.append((f.year, descripcion))
+        insort(self.historial, (f.year, descripcion))
 
     def marcar_fallecido(self, fecha_def: Optional[date] = None):
         if self.fecha_fallecimiento is None:
@@ -476,6 +478,13 @@ class App(ctk.CTk):
         # Estado
         self.familia_activa: Optional[str] = None
         self.segundos = 0
+        # Reloj monotónico como fuente de verdad del contador: el after de
+        # 1s acumula deriva y el conteo manual se desfasa con el tiempo
+        self._t0 = time.monotonic()
+        # Últimos textos pintados: configure() cruza a Tcl aunque el texto
+        # no cambie, así que sólo se llama cuando difiere
+        self._ultimo_tiempo_txt = ""
+        self._ultima_fecha_txt = ""
 
         # Layout minimalista: sidebar + main
         self.sidebar = ctk.CTkFrame(self, width=240, corner_radius=0)
@@ -1001,17 +1010,18 @@ class App(ctk.CTk):
         if not p:
             self.txt_hist.insert(tk.END, "Ingrese cédula para ver historial\n")
             return
-        for anio, ev in sorted(p.historial):
-            self.txt_hist.insert(tk.END, f"{anio}: {ev}\n")
+        # historial ya ordenado por año (insort en registrar_evento); un
+        # solo insert con el bloque completo: el Text reindexa una vez en
+        # lugar de una por evento
+        self.txt_hist.insert(tk.END, "".join(f"{anio}: {ev}\n" for anio, ev in p.historial))
         # Timeline
         if p.historial:
-            years = [a for a, _ in p.historial]
-            y_min, y_max = min(years), max(years)
+            y_min, y_max = p.historial[0][0], p.historial[-1][0]
             w = self.canvas_timeline.winfo_width() or 800
             margin = 40
             self.canvas_timeline.create_line(margin, 60, w - margin, 60, fill="#6b7280")
             span = max(1, y_max - y_min)
-            for anio, ev in sorted(p.historial):
+            for anio, ev in p.historial:
                 x = margin + int((w - 2 * margin) * (anio - y_min) / span)
                 self.canvas_timeline.create_oval(x - 4, 56, x + 4, 64, fill="#1f6aa5", outline="")
                 self.canvas_timeline.create_text(x, 75, text=str(anio), fill="#a9b1bc", font=("Segoe UI", 9))
@@ -1019,17 +1029,32 @@ class App(ctk.CTk):
 
     # ---------------- Reloj / Motor de eventos ----------------
     def _tick(self):
-        self.segundos += 1
-        self.lbl_tiempo.configure(text=f"Tiempo: {self.segundos}s")
-        self.lbl_fecha.configure(text=f"Fecha sim.: {self.modelo.fecha_simulada.isoformat()}")
-        if self.familia_activa and self.segundos % self.EVENTO_CADA == 0:
+        # Derivar los segundos del monotónico; si un ciclo llega tarde y se
+        # salta un valor, disparar igual los eventos pendientes del tramo
+        previos = self.segundos
+        self.segundos = int(time.monotonic() - self._t0)
+        if self.segundos == previos:
+            self.segundos = previos + 1  # nunca retroceder ni estancarse
+        tiempo_txt = f"Tiempo: {self.segundos}s"
+        if tiempo_txt != self._ultimo_tiempo_txt:
+            self._ultimo_tiempo_txt = tiempo_txt
+            self.lbl_tiempo.configure(text=tiempo_txt)
+        fecha_txt = f"Fecha sim.: {self.modelo.fecha_simulada.isoformat()}"
+        if fecha_txt != self._ultima_fecha_txt:
+            self._ultima_fecha_txt = fecha_txt
+            self.lbl_fecha.configure(text=fecha_txt)
+        if self.familia_activa and self.segundos // self.EVENTO_CADA > previos // self.EVENTO_CADA:
             # Ejecutar eventos
             self.modelo.evento_cada_10s(self.familia_activa)
             # Refrescar vistas posibles
             self._refrescar_personas()
-            if self.frames.get("arbol") and str(self.frames["arbol"].winfo_ismapped()):
+            # winfo_ismapped ya devuelve bool: el str() anterior hacía
+            # verdadero también al "0" y redibujaba vistas ocultas
+            fr = self.frames.get("arbol")
+            if fr is not None and fr.winfo_ismapped():
                 self._redibujar_arbol()
-            if self.frames.get("historial") and str(self.frames["historial"].winfo_ismapped()):
+            fr = self.frames.get("historial")
+            if fr is not None and fr.winfo_ismapped():
                 self._refrescar_historial()
         self.after(self.REFRESH_MS, self._tick)
 
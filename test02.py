@@ -1,5 +1,6 @@
 # familytree_ctk.py
 import datetime
+import time
 import customtkinter as ctk
 from PIL import Image
 
@@ -15,6 +16,10 @@ TEXT_LIGHT    = "#E6F1F5"
 WINDOW_W, WINDOW_H = 1366, 768
 SIDEBAR_W = 190
 
+# Cache de imágenes por (ruta, tamaño): abrir + LANCZOS es caro y los
+# rebuilds de la UI piden los mismos assets una y otra vez
+_IMG_CACHE = {}
+
 ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("dark-blue")
 
@@ -36,7 +41,8 @@ class App(ctk.CTk):
         self._build_main()
 
         # Tiempo
-        self.start_time = datetime.datetime.now()
+        self._t0 = time.monotonic()
+        self._ultimo_tiempo = -1
         self._tick_time()
 
     # ---------- Sidebar ----------
@@ -96,6 +102,14 @@ class App(ctk.CTk):
 
     # ---------- Utils ----------
     def _safe_image(self, path, size):
+        clave = (path, size)
+        cacheada = _IMG_CACHE.get(clave)
+        if cacheada is not None:
+            return cacheada
+        _IMG_CACHE[clave] = img = self._cargar_imagen(path, size)
+        return img
+
+    def _cargar_imagen(self, path, size):
         try:
             img = Image.open(path).convert("RGBA")
             if size:
@@ -116,8 +130,11 @@ class App(ctk.CTk):
             return ctk.CTkImage(light_image=ph, dark_image=ph, size=size)
 
     def _tick_time(self):
-        elapsed = (datetime.datetime.now() - self.start_time).seconds
-        self.lbl_time.configure(text=f"Tiempo: {elapsed}s")
+        # time.monotonic: una llamada C sin objetos datetime/timedelta por tick
+        elapsed = int(time.monotonic() - self._t0)
+        if elapsed != self._ultimo_tiempo:
+            self._ultimo_tiempo = elapsed
+            self.lbl_time.configure(text=f"Tiempo: {elapsed}s")
         self.after(1000, self._tick_time)
 
 